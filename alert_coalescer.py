@@ -0,0 +1,100 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+import discord
+from metrics import ALERT_MESSAGES
+
+
+class _ChannelAlert:
+    """Alerte en cours dans un channel (fenêtre de regroupement ouverte)"""
+
+    __slots__ = ('message', 'base_embed', 'opened_at', 'reporters', 'presses')
+
+    def __init__(self, message: discord.Message, base_embed: discord.Embed, reporter: str):
+        self.message = message
+        self.base_embed = base_embed
+        self.opened_at = time.monotonic()
+        self.reporters: List[str] = [reporter]
+        self.presses = 1
+
+
+class AlertCoalescer:
+    """
+    Regroupe les alertes simultanées d'un même channel en un seul message
+
+    La première alerte est postée normalement ; les suivantes, dans les
+    `window` secondes, modifient ce message pour ajouter le signaleur et
+    incrémenter le compteur au lieu de poster (et de pinger le rôle) à
+    nouveau. L'état est tenu par channel, chaque channel ayant son verrou
+    pour que deux appuis simultanés ne postent pas deux messages.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._alerts: Dict[int, _ChannelAlert] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+        # Métriques
+        self.posted = 0
+        self.coalesced = 0
+        self._posted_metric = ALERT_MESSAGES.labels('posted')
+        self._coalesced_metric = ALERT_MESSAGES.labels('coalesced')
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def lock(self, channel_id: int) -> asyncio.Lock:
+        lock = self._locks.get(channel_id)
+        if lock is None:
+            lock = self._locks[channel_id] = asyncio.Lock()
+        return lock
+
+    def active(self, channel_id: int) -> Optional[_ChannelAlert]:
+        """Retourne l'alerte en cours du channel si sa fenêtre est encore ouverte"""
+        alert = self._alerts.get(channel_id)
+        if alert is not None and time.monotonic() - alert.opened_at > self.window:
+            del self._alerts[channel_id]
+            return None
+        return alert
+
+    def opened(self, channel_id: int, message: discord.Message, embed: discord.Embed, reporter: str):
+        """Enregistre une alerte qui vient d'être postée"""
+        self.posted += 1
+        self._posted_metric.inc()
+        if self.enabled:
+            self._alerts[channel_id] = _ChannelAlert(message, embed, reporter)
+
+    def discard(self, channel_id: int):
+        """Ferme la fenêtre de regroupement du channel"""
+        self._alerts.pop(channel_id, None)
+
+    def merge(self, alert: _ChannelAlert, reporter: str) -> discord.Embed:
+        """
+        Construit l'embed de l'alerte en cours avec un signaleur de plus
+
+        L'alerte n'est pas modifiée : merged() enregistre l'appui une fois le
+        message existant effectivement mis à jour.
+
+        Returns:
+            discord.Embed: L'embed mis à jour à appliquer sur le message existant
+        """
+        reporters = alert.reporters if reporter in alert.reporters else alert.reporters + [reporter]
+        embed = alert.base_embed.copy()
+        embed.add_field(
+            name=f"👥 Signalements ({alert.presses + 1})",
+            value=", ".join(reporters)[:1024],
+            inline=False
+        )
+        return embed
+
+    def merged(self, alert: _ChannelAlert, reporter: str):
+        """Enregistre un appui regroupé dont la modification du message a réussi"""
+        self.coalesced += 1
+        self._coalesced_metric.inc()
+        alert.presses += 1
+        if reporter not in alert.reporters:
+            alert.reporters.append(reporter)
+
+    def stats(self) -> Dict[str, int]:
+        """Messages postés et envois économisés par regroupement"""
+        return {'posted': self.posted, 'coalesced': self.coalesced, 'sends_saved': self.coalesced}
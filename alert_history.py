@@ -0,0 +1,281 @@
+import logging
+import math
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional
+from batch_queue import STOP, drain_batches
+from config import Config
+
+logger = logging.getLogger('discord_bot')
+
+# Histogramme des latences : 4 buckets par puissance de 2 (~19% de résolution)
+_BUCKETS_PER_OCTAVE = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    day TEXT NOT NULL,
+    guild_id INTEGER,
+    channel_id INTEGER,
+    reporter_id INTEGER NOT NULL,
+    reporter_name TEXT NOT NULL,
+    targets INTEGER NOT NULL,
+    delivered INTEGER NOT NULL,
+    latency_ms REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS alerts_ts ON alerts (ts);
+CREATE INDEX IF NOT EXISTS alerts_reporter ON alerts (reporter_id, ts);
+
+CREATE TABLE IF NOT EXISTS daily_stats (
+    day TEXT PRIMARY KEY,
+    alerts INTEGER NOT NULL,
+    delivered INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reporter_stats (
+    reporter_id INTEGER PRIMARY KEY,
+    reporter_name TEXT NOT NULL,
+    alerts INTEGER NOT NULL,
+    last_ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reporter_stats_alerts ON reporter_stats (alerts DESC);
+CREATE TABLE IF NOT EXISTS latency_histogram (
+    day TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, bucket)
+);
+"""
+
+
+class AlertRecord(NamedTuple):
+    """Une alerte livrée (ou non), telle qu'enregistrée dans l'historique"""
+    ts: float
+    guild_id: Optional[int]
+    channel_id: Optional[int]
+    reporter_id: int
+    reporter_name: str
+    targets: int
+    delivered: int
+    latency_ms: float
+
+
+def _day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%d')
+
+
+def latency_bucket(latency_ms: float) -> int:
+    return int(math.floor(math.log2(max(latency_ms, 1.0)) * _BUCKETS_PER_OCTAVE))
+
+
+def bucket_midpoint(bucket: int) -> float:
+    """Valeur centrale (moyenne géométrique) d'un bucket de latence, en ms"""
+    return 2 ** ((bucket + 0.5) / _BUCKETS_PER_OCTAVE)
+
+
+class AlertHistoryStore:
+    """
+    Historique des alertes dans SQLite (mode WAL)
+
+    `record` ne fait qu'un put dans une file : un thread d'écriture vide la
+    file par lots, une transaction par lot, et met à jour dans la même
+    transaction les agrégats (alertes par jour, compteurs par signaleur,
+    histogramme des latences par jour). Les statistiques sont lues dans ces
+    agrégats, jamais par un parcours de la table `alerts` : leur coût ne
+    dépend que du nombre de jours demandés.
+
+    `stats` est bloquant (lecture disque) : depuis la boucle asyncio,
+    l'appeler via asyncio.to_thread.
+    """
+
+    def __init__(self, path: str, batch_size: int = 200, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+        # Métriques
+        self.written = 0
+        self.failed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Démarre le thread d'écriture (qui crée la base si besoin)"""
+        if not self.enabled or self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name='alert-history', daemon=True)
+        self._thread.start()
+        logger.info(f"Alert history stored in {self.path}")
+
+    def stop(self):
+        """Écrit les alertes en file puis arrête le thread"""
+        if not self.running:
+            return
+        self._queue.put(STOP)
+        self._thread.join(timeout=10)
+        self._thread = None
+        with self._read_lock:
+            if self._read_conn is not None:
+                self._read_conn.close()
+                self._read_conn = None
+
+    def record(self, record: AlertRecord):
+        """Met une alerte en file d'écriture (ne touche jamais le disque)"""
+        if self.running:
+            self._queue.put(record)
+
+    # -- Écriture (thread d'arrière-plan) ---------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _run(self):
+        try:
+            conn = self._connect()
+            conn.executescript(SCHEMA)
+        except sqlite3.Error as e:
+            logger.error(f"Alert history disabled, cannot open {self.path}: {e}")
+            self._ready.set()
+            return
+        self._ready.set()
+
+        drain_batches(self._queue, lambda batch: self._write(conn, batch), self.batch_size, self.flush_interval)
+        conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: List[AlertRecord]):
+        rows = []
+        daily: Dict[str, List[int]] = {}
+        reporters: Dict[int, list] = {}
+        histogram: Dict[tuple, int] = {}
+        for record in batch:
+            day = _day(record.ts)
+            rows.append((record.ts, day, record.guild_id, record.channel_id, record.reporter_id,
+                         record.reporter_name, record.targets, record.delivered, record.latency_ms))
+            counts = daily.setdefault(day, [0, 0])
+            counts[0] += 1
+            counts[1] += 1 if record.delivered else 0
+            reporter = reporters.setdefault(record.reporter_id, [record.reporter_name, 0, record.ts])
+            reporter[0] = record.reporter_name
+            reporter[1] += 1
+            reporter[2] = max(reporter[2], record.ts)
+            if record.delivered:
+                key = (day, latency_bucket(record.latency_ms))
+                histogram[key] = histogram.get(key, 0) + 1
+
+        try:
+            with conn:
+                conn.executemany(
+                    'INSERT INTO alerts (ts, day, guild_id, channel_id, reporter_id, reporter_name,'
+                    ' targets, delivered, latency_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    rows
+                )
+                conn.executemany(
+                    'INSERT INTO daily_stats (day, alerts, delivered) VALUES (?, ?, ?)'
+                    ' ON CONFLICT (day) DO UPDATE SET alerts = alerts + excluded.alerts,'
+                    ' delivered = delivered + excluded.delivered',
+                    [(day, alerts, delivered) for day, (alerts, delivered) in daily.items()]
+                )
+                conn.executemany(
+                    'INSERT INTO reporter_stats (reporter_id, reporter_name, alerts, last_ts) VALUES (?, ?, ?, ?)'
+                    ' ON CONFLICT (reporter_id) DO UPDATE SET reporter_name = excluded.reporter_name,'
+                    ' alerts = alerts + excluded.alerts, last_ts = MAX(last_ts, excluded.last_ts)',
+                    [(reporter_id, name, alerts, last_ts) for reporter_id, (name, alerts, last_ts) in reporters.items()]
+                )
+                conn.executemany(
+                    'INSERT INTO latency_histogram (day, bucket, count) VALUES (?, ?, ?)'
+                    ' ON CONFLICT (day, bucket) DO UPDATE SET count = count + excluded.count',
+                    [(day, bucket, count) for (day, bucket), count in histogram.items()]
+                )
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            self.failed += len(batch)
+            logger.error(f"Failed to store {len(batch)} alert(s) in history: {e}")
+
+    # -- Lecture (bloquante) ----------------------------------------------
+
+    def stats(self, days: int = 7, top: int = 5) -> Optional[dict]:
+        """
+        Alertes par jour, meilleurs signaleurs et latence médiane
+
+        Args:
+            days: Nombre de jours couverts (jour courant inclus, UTC)
+            top: Nombre de signaleurs retournés (classement depuis le début)
+
+        Returns:
+            dict: Les statistiques, ou None si l'historique est désactivé ou indisponible
+        """
+        if not self.running or not self._ready.wait(timeout=5):
+            return None
+        since = (datetime.now(timezone.utc) - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        try:
+            with self._read_lock:
+                if self._read_conn is None:
+                    self._read_conn = self._connect()
+                conn = self._read_conn
+                per_day = conn.execute(
+                    'SELECT day, alerts, delivered FROM daily_stats WHERE day >= ? ORDER BY day', (since,)
+                ).fetchall()
+                reporters = conn.execute(
+                    'SELECT reporter_id, reporter_name, alerts FROM reporter_stats ORDER BY alerts DESC LIMIT ?', (top,)
+                ).fetchall()
+                buckets = conn.execute(
+                    'SELECT bucket, SUM(count) FROM latency_histogram WHERE day >= ? GROUP BY bucket ORDER BY bucket',
+                    (since,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read alert history stats: {e}")
+            return None
+
+        total = sum(alerts for _, alerts, _ in per_day)
+        return {
+            'days': days,
+            'total': total,
+            'per_day': [{'day': day, 'alerts': alerts, 'delivered': delivered} for day, alerts, delivered in per_day],
+            'average_per_day': round(total / days, 2),
+            'top_reporters': [
+                {'reporter_id': reporter_id, 'name': name, 'alerts': alerts}
+                for reporter_id, name, alerts in reporters
+            ],
+            'median_latency_ms': self._median(buckets),
+        }
+
+    @staticmethod
+    def _median(buckets: List[tuple]) -> Optional[float]:
+        """Médiane approchée (à ~10% près) depuis l'histogramme des latences"""
+        count = sum(n for _, n in buckets)
+        if not count:
+            return None
+        seen = 0
+        for bucket, n in buckets:
+            seen += n
+            if seen * 2 >= count:
+                return round(bucket_midpoint(bucket), 1)
+        return None
+
+
+def record_alert(guild_id: Optional[int], channel_id: Optional[int], reporter_id: int,
+                 reporter_name: str, targets: int, delivered: int, latency_ms: float):
+    """Enregistre une alerte dans l'historique partagé"""
+    alert_history.record(AlertRecord(
+        time.time(), guild_id, channel_id, reporter_id, reporter_name, targets, delivered, latency_ms
+    ))
+
+
+# Historique partagé, démarré dans DiscordBot.setup_hook
+alert_history = AlertHistoryStore(Config.ALERT_HISTORY_DB)
@@ -0,0 +1,346 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence
+import discord
+from config import Config
+from alert_coalescer import AlertCoalescer
+from alert_history import record_alert
+from alert_targets import AlertTarget, ChannelTarget, TargetError
+from metrics import ALERT_STAGE_DURATION, count_error
+from rest_scheduler import Priority, RequestDropped, RequestExpired, rest_scheduler
+
+logger = logging.getLogger('discord_bot')
+
+# Nombre de mesures conservées pour les statistiques de timing
+_TIMING_WINDOW = 500
+
+
+def _target_line(result: 'TargetResult') -> str:
+    if result.message is not None:
+        return f"✅ {result.target.label} — [Voir le message]({result.message.jump_url})"
+    return f"❌ {result.target.label} — {result.reason}"
+
+
+def build_success_embed(success_message: str, results: List['TargetResult']) -> discord.Embed:
+    """Construit l'embed de confirmation envoyé à l'utilisateur (une ligne par destination)"""
+    if len(results) == 1 and results[0].message is not None:
+        result = results[0]
+        return discord.Embed(
+            title="✅ Succès",
+            description=f"{success_message}\n"
+                       f"**Channel:** {result.target.label}\n"
+                       f"**Message:** [Voir le message]({result.message.jump_url})",
+            color=discord.Color.green()
+        )
+
+    delivered = sum(1 for result in results if result.message is not None)
+    if delivered == len(results):
+        title, color = "✅ Succès", discord.Color.green()
+    elif delivered:
+        title, color = f"⚠️ Alerte envoyée à {delivered}/{len(results)} destinations", discord.Color.orange()
+    else:
+        title, color = "❌ L'alerte n'a pu être envoyée à aucune destination", discord.Color.red()
+    lines = [success_message] if delivered else []
+    lines += [_target_line(result) for result in results]
+    return discord.Embed(title=title, description="\n".join(lines), color=color)
+
+
+def failure_message(error: BaseException) -> str:
+    """Message d'erreur affiché à l'utilisateur pour un envoi échoué"""
+    if isinstance(error, TargetError):
+        return str(error)
+    if isinstance(error, (RequestExpired, asyncio.TimeoutError)):
+        return "❌ La destination n'a pas répondu à temps."
+    if isinstance(error, RequestDropped):
+        return "❌ Le bot est surchargé, réessayez dans quelques secondes."
+    if isinstance(error, discord.RateLimited):
+        return f"❌ Discord limite les envois du bot, réessayez dans {math.ceil(error.retry_after)}s."
+    if isinstance(error, discord.Forbidden):
+        return "❌ Permission refusée. Le bot n'a pas les droits nécessaires."
+    if isinstance(error, discord.HTTPException):
+        return f"❌ Erreur lors de l'envoi du message: {str(error)}"
+    return "❌ Une erreur inattendue s'est produite."
+
+
+async def reply(interaction: discord.Interaction, content: Optional[str] = None, *, embed: Optional[discord.Embed] = None):
+    """Répond en éphémère, via la réponse initiale ou un follow-up si elle est déjà faite"""
+    kwargs = {'ephemeral': True}
+    if content is not None:
+        kwargs['content'] = content
+    if embed is not None:
+        kwargs['embed'] = embed
+    if interaction.response.is_done():
+        await interaction.followup.send(**kwargs)
+    else:
+        await interaction.response.send_message(**kwargs)
+
+
+class AlertTimings:
+    """Fenêtre glissante des durées (ms) de chaque étape d'une alerte"""
+
+    STAGES = ('ack', 'delivery', 'followup')
+
+    def __init__(self, window: int = _TIMING_WINDOW):
+        self._samples: Dict[str, Deque[float]] = {stage: deque(maxlen=window) for stage in self.STAGES}
+        self._histograms = {stage: ALERT_STAGE_DURATION.labels(stage) for stage in self.STAGES}
+
+    def record(self, stage: str, duration_ms: float):
+        self._samples[stage].append(duration_ms)
+        self._histograms[stage].observe(duration_ms / 1000)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Retourne count/p50/p95/max par étape"""
+        result = {}
+        for stage, samples in self._samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            result[stage] = {
+                'count': len(ordered),
+                'p50_ms': round(ordered[len(ordered) // 2], 1),
+                'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+                'max_ms': round(ordered[-1], 1),
+            }
+        return result
+
+
+class TargetResult:
+    """Résultat de l'envoi d'une alerte vers une destination"""
+
+    __slots__ = ('target', 'message', 'error')
+
+    def __init__(self, target: AlertTarget, message: Optional[discord.Message] = None,
+                 error: Optional[BaseException] = None):
+        self.target = target
+        self.message = message
+        self.error = error
+
+    @property
+    def reason(self) -> str:
+        return failure_message(self.error).removeprefix("❌ ")
+
+
+class AlertJob:
+    """Une alerte acquittée, en attente de livraison"""
+
+    __slots__ = ('interaction', 'targets', 'embed', 'success_message', 'acked_at', 'pressed_at')
+
+    def __init__(self, interaction: discord.Interaction, targets: Sequence[AlertTarget],
+                 embed: discord.Embed, success_message: str, acked_at: float,
+                 pressed_at: Optional[float] = None):
+        self.interaction = interaction
+        self.targets = targets
+        self.embed = embed
+        self.success_message = success_message
+        self.acked_at = acked_at
+        self.pressed_at = acked_at if pressed_at is None else pressed_at
+
+
+class AlertPipeline:
+    """
+    Livraison des alertes en arrière-plan
+
+    Le bouton acquitte l'interaction immédiatement (defer), puis soumet un
+    AlertJob ; des workers asyncio postent l'alerte et envoient le lien en
+    follow-up. Les durées d'acquittement, de livraison et de follow-up sont
+    enregistrées dans `timings`.
+
+    Une alerte part vers toutes ses destinations en parallèle (au plus
+    `fanout_concurrency` à la fois) : une destination lente ou interdite ne
+    retarde pas les autres, et chacune a sa route dans l'ordonnanceur REST,
+    donc son propre bucket de rate limit. Un envoi qui n'a pas démarré dans
+    les `target_timeout` secondes est abandonné ; un envoi commencé va
+    toujours à son terme.
+
+    Les appuis simultanés pour une même destination sont regroupés par
+    `coalescer` en un seul message mis à jour.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 100, coalesce_window: float = 0,
+                 fanout_concurrency: int = 4, target_timeout: float = 10):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.fanout_concurrency = max(1, fanout_concurrency)
+        self.target_timeout = target_timeout
+        self.timings = AlertTimings()
+        self.coalescer = AlertCoalescer(coalesce_window)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def start(self):
+        """Démarre les workers sur la boucle courante"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f'alert-worker-{i}')
+            for i in range(self.workers)
+        ]
+        logger.info(f"Alert pipeline started with {self.workers} worker(s)")
+
+    async def stop(self):
+        """Termine les alertes en file puis arrête les workers"""
+        if not self._tasks:
+            return
+        try:
+            if self.running:
+                await asyncio.wait_for(self._queue.join(), timeout=10)
+        except asyncio.TimeoutError:
+            pass
+        if self._queue.qsize():
+            logger.warning(f"Alert pipeline stopped with {self._queue.qsize()} pending alert(s)")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, job: AlertJob) -> bool:
+        """
+        Met une alerte en file sans attendre
+
+        Returns:
+            bool: False si aucun worker ne tourne ou si la file est pleine
+        """
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            logger.warning("Alert queue full, delivering inline")
+            return False
+        return True
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self.deliver(job)
+            except Exception as e:
+                # Une erreur imprévue ne doit pas tuer le worker : l'alerte suivante doit partir
+                count_error(type(e).__name__)
+                logger.error(f"Alert delivery for {job.interaction.user} failed: {type(e).__name__} {e}")
+                await self._report_failure(job.interaction, failure_message(e))
+            finally:
+                self._queue.task_done()
+
+    async def deliver(self, job: AlertJob):
+        """Poste l'alerte vers chaque destination puis envoie le bilan en follow-up"""
+        interaction = job.interaction
+        delivery_start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.fanout_concurrency)
+        results = await asyncio.gather(*(self._deliver_target(job, target, semaphore) for target in job.targets))
+        followup_start = time.perf_counter()
+        self.timings.record('delivery', (followup_start - delivery_start) * 1000)
+        delivered = [result.target.route for result in results if result.message is not None]
+        # Premier channel du bot parmi les destinations (un ID de webhook n'est pas un channel)
+        channel_id = next((target.key for target in job.targets if isinstance(target, ChannelTarget)), None)
+        record_alert(
+            interaction.guild_id, channel_id, interaction.user.id, str(interaction.user),
+            len(results), len(delivered), (followup_start - job.pressed_at) * 1000
+        )
+
+        # Une seule destination en échec : message d'erreur simple, comme avant
+        if len(results) == 1 and results[0].error is not None:
+            await self._report_failure(interaction, failure_message(results[0].error))
+            return
+
+        success_embed = build_success_embed(job.success_message, results)
+        try:
+            await rest_scheduler.run(
+                Priority.INTERACTION,
+                f'interaction:{interaction.id}',
+                lambda: reply(interaction, embed=success_embed)
+            )
+        except Exception as e:
+            count_error(type(e).__name__)
+            logger.error(f"Failed to send alert follow-up to {interaction.user}: {type(e).__name__} {e}")
+            return
+        done = time.perf_counter()
+        self.timings.record('followup', (done - followup_start) * 1000)
+
+        logger.info(
+            f"Alert sent by {interaction.user} to {len(delivered)}/{len(results)} target(s) "
+            f"{', '.join(delivered)} "
+            f"[queued={(delivery_start - job.acked_at) * 1000:.0f}ms "
+            f"delivery={(followup_start - delivery_start) * 1000:.0f}ms "
+            f"followup={(done - followup_start) * 1000:.0f}ms]"
+        )
+
+    async def _deliver_target(self, job: AlertJob, target: AlertTarget, semaphore: asyncio.Semaphore) -> TargetResult:
+        """Poste l'alerte vers une destination ; les erreurs sont retournées, jamais levées"""
+        async with semaphore:
+            try:
+                message = await self._post(job, target, time.monotonic() + self.target_timeout)
+                return TargetResult(target, message=message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                count_error(type(e).__name__)
+                if isinstance(e, discord.Forbidden):
+                    logger.error(f"Forbidden: Cannot send message to {target.route}")
+                else:
+                    logger.error(f"Alert delivery to {target.route} failed: {type(e).__name__} {e}")
+                return TargetResult(target, error=e)
+
+    async def _post(self, job: AlertJob, target: AlertTarget, deadline: float) -> discord.Message:
+        """
+        Poste l'alerte, ou met à jour l'alerte en cours de la destination
+
+        `deadline` borne l'attente avant l'envoi (résolution, file de
+        l'ordonnanceur) : un envoi commencé va toujours à son terme, sinon le
+        message pourrait être posté alors que l'alerte est signalée en échec,
+        sans que le regroupement ne le connaisse.
+        """
+        reporter = job.interaction.user.mention
+        client = job.interaction.client
+        # Résolution hors de l'ordonnanceur (lecture du cache, ou fetch si besoin), sans effet de bord
+        await asyncio.wait_for(target.prepare(client), timeout=max(0.0, deadline - time.monotonic()))
+
+        async def send_new() -> discord.Message:
+            message = await rest_scheduler.run(
+                Priority.ALERT, target.route, lambda: target.send(client, job.embed), deadline=deadline
+            )
+            self.coalescer.opened(target.key, message, job.embed, reporter)
+            return message
+
+        if not self.coalescer.enabled:
+            return await send_new()
+
+        async with self.coalescer.lock(target.key):
+            alert = self.coalescer.active(target.key)
+            if alert is None:
+                return await send_new()
+            embed = self.coalescer.merge(alert, reporter)
+            try:
+                await rest_scheduler.run(
+                    Priority.ALERT, target.route, lambda: alert.message.edit(embed=embed), deadline=deadline
+                )
+                self.coalescer.merged(alert, reporter)
+                return alert.message
+            except discord.NotFound:
+                # Le message d'alerte a été supprimé entre-temps : en poster un nouveau
+                self.coalescer.discard(target.key)
+                return await send_new()
+
+    async def _report_failure(self, interaction: discord.Interaction, content: str):
+        try:
+            await reply(interaction, content)
+        except Exception as e:
+            count_error(type(e).__name__)
+            logger.error(f"Failed to report alert failure to {interaction.user}: {type(e).__name__} {e}")
+
+
+# Pipeline partagé, démarré dans DiscordBot.setup_hook
+alert_pipeline = AlertPipeline(
+    workers=Config.ALERT_WORKERS,
+    coalesce_window=Config.ALERT_COALESCE_SECONDS,
+    fanout_concurrency=Config.ALERT_FANOUT_CONCURRENCY,
+    target_timeout=Config.ALERT_TARGET_TIMEOUT
+)
@@ -0,0 +1,104 @@
+import logging
+import re
+from functools import lru_cache
+from typing import Tuple, Union
+import discord
+from channels import channel_registry
+
+logger = logging.getLogger('discord_bot')
+
+# https://discord.com/api/webhooks/<id>/<token> (ou discordapp.com, canary., ptb.)
+WEBHOOK_URL_RE = re.compile(r'^https://(?:\w+\.)?discord(?:app)?\.com/api/(?:v\d+/)?webhooks/(?P<id>\d+)/[\w-]+$')
+
+
+class TargetError(Exception):
+    """Une destination ne peut pas recevoir l'alerte (message destiné à l'utilisateur)"""
+
+
+class ChannelTarget:
+    """
+    Channel texte du bot, résolu via le registre des channels
+
+    Sans état propre à un appui : la même instance sert à toutes les alertes
+    d'une configuration.
+    """
+
+    def __init__(self, channel_id: int):
+        self.key = channel_id
+        self.route = f'channel:{channel_id}'
+        self.label = f"<#{channel_id}>"
+
+    async def prepare(self, client: discord.Client) -> discord.TextChannel:
+        """
+        Résout et vérifie le channel
+
+        Raises:
+            TargetError: Si le channel est introuvable, pas un channel texte, ou interdit au bot
+        """
+        entry = channel_registry.get(self.key) or await channel_registry.resolve(client, self.key)
+        if not entry:
+            raise TargetError("❌ Channel non trouvé! Vérifiez la configuration.")
+        if not entry.is_text:
+            raise TargetError("❌ Le channel configuré n'est pas un channel de texte!")
+        if not entry.can_send:
+            raise TargetError(f"❌ Le bot n'a pas la permission d'envoyer des messages dans {entry.channel.mention}")
+        return entry.channel
+
+    async def send(self, client: discord.Client, embed: discord.Embed) -> discord.Message:
+        channel = await self.prepare(client)
+        return await channel.send(embed=embed)
+
+
+class WebhookTarget:
+    """Webhook Discord (par exemple le channel d'une guilde alliée où le bot n'est pas)"""
+
+    def __init__(self, url: str, webhook_id: int):
+        self.url = url
+        self.key = webhook_id
+        self.route = f'webhook:{webhook_id}'
+        self.label = f"webhook {webhook_id}"
+
+    async def prepare(self, client: discord.Client):
+        return None
+
+    async def send(self, client: discord.Client, embed: discord.Embed) -> discord.WebhookMessage:
+        webhook = discord.Webhook.from_url(self.url, client=client)
+        return await webhook.send(embed=embed, wait=True)
+
+
+AlertTarget = Union[ChannelTarget, WebhookTarget]
+
+
+def parse_target(spec: str) -> AlertTarget:
+    """
+    Convertit une entrée de ALERT_TARGETS en destination
+
+    Raises:
+        ValueError: Si l'entrée n'est ni un ID de channel ni une URL de webhook
+    """
+    spec = spec.strip()
+    if spec.isdigit():
+        return ChannelTarget(int(spec))
+    match = WEBHOOK_URL_RE.match(spec)
+    if match:
+        return WebhookTarget(spec, int(match.group('id')))
+    raise ValueError(f"Destination d'alerte invalide: {spec[:40]}")
+
+
+@lru_cache(maxsize=1)
+def parse_targets(specs: Tuple[str, ...], fallback_channel_id: int) -> Tuple[AlertTarget, ...]:
+    """
+    Construit les destinations d'une configuration
+
+    Le résultat est mis en cache : ALERT_TARGETS n'est analysé qu'une fois
+    par configuration chargée, pas à chaque appui. Les entrées invalides sont
+    ignorées (avec un avertissement ; validate_config les signale aussi) ; si
+    aucune n'est valide, le channel de repli est utilisé.
+    """
+    targets = []
+    for spec in specs:
+        try:
+            targets.append(parse_target(spec))
+        except ValueError as e:
+            logger.warning(str(e))
+    return tuple(targets) or (ChannelTarget(fallback_channel_id),)
@@ -0,0 +1,38 @@
+import queue
+import time
+from typing import Callable, List
+
+# Sentinelle envoyée dans la file pour arrêter la boucle d'écriture
+STOP = object()
+
+
+def drain_batches(items: queue.SimpleQueue, write: Callable[[List], None],
+                  batch_size: int, flush_interval: float):
+    """
+    Vide une file par lots jusqu'à la réception de STOP (boucle d'un thread d'écriture)
+
+    Attend un premier élément, récupère tout ce qui est déjà en file (jusqu'à
+    batch_size), puis passe le lot à `write`. Un lot partiel est écrit au plus
+    tard après flush_interval. Les éléments mis en file avant STOP sont écrits.
+    """
+    stopping = False
+    while not stopping:
+        batch: List = []
+        try:
+            item = items.get(timeout=flush_interval)
+        except queue.Empty:
+            continue
+        deadline = time.monotonic() + flush_interval
+        while True:
+            if item is STOP:
+                stopping = True
+                break
+            batch.append(item)
+            if len(batch) >= batch_size or time.monotonic() >= deadline:
+                break
+            try:
+                item = items.get_nowait()
+            except queue.Empty:
+                break
+        if batch:
+            write(batch)
@@ -0,0 +1,208 @@
+"""
+Empreinte mémoire des profils de cache (CACHE_PROFILE / SLASH_ONLY)
+
+Chaque profil est mesuré dans un processus séparé : un vrai ConnectionState
+discord.py, construit avec les options de cache_profile.client_options,
+reçoit les événements gateway qu'enverrait Discord pour les intents du
+profil, sans connexion réseau :
+  - GUILD_CREATE de --guilds serveurs de --members membres, avec leurs rôles
+    et channels ; les membres en vocal (--voice-ratio) et leurs voice states
+    ne sont envoyés qu'avec l'intent voice_states
+  - --messages MESSAGE_CREATE d'auteurs tirés parmi les membres, seulement
+    avec l'intent guild_messages
+
+Mesures : membres et messages en cache, mémoire Python retenue
+(tracemalloc, après gc) et hausse du RSS du processus pendant l'ingestion.
+
+Usage:
+    python benchmarks/bench_cache_profiles.py --guilds 3 --members 12000 --messages 20000
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('LOG_FILE', '')
+
+import discord  # noqa: E402
+from cache_profile import client_options  # noqa: E402
+from config import ConfigSnapshot  # noqa: E402
+
+# Profils comparés : nom affiché -> variables d'environnement
+PROFILES = {
+    'default': {'CACHE_PROFILE': 'default'},
+    'default+slash-only': {'CACHE_PROFILE': 'default', 'SLASH_ONLY': 'true'},
+    'lean': {'CACHE_PROFILE': 'lean'},
+    'lean+slash-only': {'CACHE_PROFILE': 'lean', 'SLASH_ONLY': 'true'},
+}
+BOT_ID = 1
+TIMESTAMP = '2024-01-01T00:00:00+00:00'
+
+
+def _rss_bytes() -> int:
+    """RSS courant (/proc), à défaut le pic (getrusage)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _user(user_id: int) -> dict:
+    return {'id': str(user_id), 'username': f'user{user_id}', 'global_name': f'User {user_id}',
+            'discriminator': '0', 'avatar': None}
+
+
+def _member(user_id: int, role_ids) -> dict:
+    return {'user': _user(user_id), 'roles': [str(role_id) for role_id in role_ids],
+            'joined_at': TIMESTAMP, 'deaf': False, 'mute': False, 'flags': 0}
+
+
+def guild_payload(guild_id: int, members: int, args, intents: discord.Intents, rng: random.Random) -> tuple:
+    base = guild_id * 1_000_000
+    role_ids = [base + 100 + i for i in range(args.roles)]
+    channel_ids = [base + 10_000 + i for i in range(args.channels)]
+    voice_channel = base + 9_999
+
+    payload_members = [_member(BOT_ID, [])]
+    voice_states = []
+    if intents.voice_states:
+        for user_id in rng.sample(range(base + 100_000, base + 100_000 + members), int(members * args.voice_ratio)):
+            payload_members.append(_member(user_id, rng.sample(role_ids, min(3, len(role_ids)))))
+            voice_states.append({
+                'channel_id': str(voice_channel), 'user_id': str(user_id), 'session_id': f's{user_id}',
+                'deaf': False, 'mute': False, 'self_deaf': False, 'self_mute': False,
+                'self_video': False, 'suppress': False, 'request_to_speak_timestamp': None,
+            })
+
+    roles = [{'id': str(guild_id), 'name': '@everyone', 'color': 0, 'hoist': False, 'position': 0,
+              'permissions': '0', 'managed': False, 'mentionable': False}]
+    roles += [{'id': str(role_id), 'name': f'role-{i}', 'color': 0, 'hoist': False, 'position': i + 1,
+               'permissions': '0', 'managed': False, 'mentionable': False} for i, role_id in enumerate(role_ids)]
+    channels = [{'id': str(channel_id), 'type': 0, 'name': f'channel-{i}', 'position': i,
+                 'permission_overwrites': [], 'guild_id': str(guild_id)} for i, channel_id in enumerate(channel_ids)]
+    channels.append({'id': str(voice_channel), 'type': 2, 'name': 'vocal', 'position': len(channels),
+                     'permission_overwrites': [], 'guild_id': str(guild_id), 'bitrate': 64000, 'user_limit': 0})
+
+    return {
+        'id': str(guild_id), 'name': f'guild-{guild_id}', 'icon': None, 'owner_id': str(base + 100_000),
+        'member_count': members, 'large': True, 'unavailable': False, 'features': [], 'emojis': [],
+        'stickers': [], 'roles': roles, 'channels': channels, 'threads': [], 'members': payload_members,
+        'voice_states': voice_states, 'presences': [], 'stage_instances': [], 'guild_scheduled_events': [],
+        'verification_level': 0, 'default_message_notifications': 0, 'explicit_content_filter': 0,
+        'mfa_level': 0, 'premium_tier': 0, 'preferred_locale': 'fr', 'nsfw_level': 0,
+        'joined_at': TIMESTAMP,
+    }, role_ids, channel_ids
+
+
+def message_payload(message_id: int, guild_id: int, channel_id: int, author_id: int, role_ids) -> dict:
+    member = _member(author_id, role_ids)
+    return {
+        'id': str(message_id), 'channel_id': str(channel_id), 'guild_id': str(guild_id),
+        'author': member.pop('user'), 'member': member, 'content': 'alerte percepteur en cours',
+        'timestamp': TIMESTAMP, 'edited_timestamp': None, 'tts': False, 'mention_everyone': False,
+        'mentions': [], 'mention_roles': [], 'attachments': [], 'embeds': [], 'pinned': False, 'type': 0,
+    }
+
+
+async def measure_profile(env: dict, args) -> dict:
+    options = client_options(ConfigSnapshot(env))
+    intents = options['intents']
+    client = discord.Client(**options)
+    state = client._connection
+    state.user = discord.ClientUser(state=state, data=_user(BOT_ID))
+    rng = random.Random(args.seed)
+
+    payloads = [guild_payload(guild_id, args.members, args, intents, rng) for guild_id in range(1, args.guilds + 1)]
+    messages = []
+    if intents.guild_messages:
+        for i in range(args.messages):
+            guild, role_ids, channel_ids = rng.choice(payloads)
+            guild_id = int(guild['id'])
+            author = guild_id * 1_000_000 + 100_000 + rng.randrange(args.members)
+            messages.append(message_payload(10**15 + i, guild_id, rng.choice(channel_ids), author,
+                                            rng.sample(role_ids, min(3, len(role_ids)))))
+
+    gc.collect()
+    rss_before = _rss_bytes()
+    tracemalloc.start()
+    for guild, _, _ in payloads:
+        state.parse_guild_create(guild)
+    for message in messages:
+        state.parse_message_create(message)
+    await asyncio.sleep(0)
+    gc.collect()
+    # Les payloads existaient déjà avant la mesure : seul le cache fait monter le RSS
+    rss_after = _rss_bytes()
+    # discord.py annote les payloads reçus : les libérer avant de compter ce qui reste
+    del payloads, messages
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'intents': intents.value,
+        'guilds': len(state.guilds),
+        'members_cached': sum(len(guild.members) for guild in state.guilds),
+        'messages_cached': len(state._messages) if state._messages is not None else 0,
+        'retained_kib': retained / 1024,
+        'alloc_peak_kib': peak / 1024,
+        'rss_delta_kib': (rss_after - rss_before) / 1024,
+    }
+
+
+def run_child(name: str, args) -> dict:
+    """Mesure un profil dans un nouveau processus (RSS non pollué par les autres)"""
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', name,
+           '--guilds', str(args.guilds), '--members', str(args.members), '--messages', str(args.messages),
+           '--roles', str(args.roles), '--channels', str(args.channels),
+           '--voice-ratio', str(args.voice_ratio), '--seed', str(args.seed)]
+    out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument('--guilds', type=int, default=3)
+    parser.add_argument('--members', type=int, default=12000, help='membres par serveur')
+    parser.add_argument('--messages', type=int, default=20000, help='messages reçus au total')
+    parser.add_argument('--roles', type=int, default=50, help='rôles par serveur')
+    parser.add_argument('--channels', type=int, default=30, help='channels texte par serveur')
+    parser.add_argument('--voice-ratio', type=float, default=0.05, help='part des membres en vocal')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='fichier JSON où enregistrer les résultats')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(measure_profile(PROFILES[args.child], args))))
+        return
+
+    print(f"{args.guilds} serveurs x {args.members} membres, {args.messages} messages\n")
+    print(f"{'profil':<20}{'intents':>10}{'membres':>9}{'messages':>10}"
+          f"{'retenu KiB':>12}{'pic KiB':>10}{'RSS +KiB':>10}")
+    results = {}
+    for name in args.profiles:
+        r = results[name] = run_child(name, args)
+        print(f"{name:<20}{r['intents']:>10}{r['members_cached']:>9}{r['messages_cached']:>10}"
+              f"{r['retained_kib']:>12.0f}{r['alloc_peak_kib']:>10.0f}{r['rss_delta_kib']:>10.0f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'args': {k: v for k, v in vars(args).items() if k not in ('output', 'child')},
+                       'results': results}, f, indent=2, sort_keys=True)
+        print(f"\nRésultats enregistrés dans {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+"""
+Charge simulée sur les chemins chauds des interactions, sans connexion Discord
+
+Scénarios (sélection avec --scenarios, motifs fnmatch) :
+  - permissions          MessageButtonView.check_user_permissions
+  - alert                MessageButtonView.send_message_to_channel, jusqu'au follow-up
+  - slash.<commande>     callbacks des commandes slash de bot.py
+  - web.<backend>.<route> routes keep_alive (client de test Flask, serveur aiohttp local)
+
+Les interactions, membres, channels et le client sont des faux en mémoire
+(benchmarks/fake_objects.py) dont les appels REST attendent --latency. Les
+opérations sont lancées à --rate par seconde (0 = au plus vite) avec au plus
+--concurrency en vol ; la latence mesurée inclut l'attente d'une place.
+
+Pour chaque scénario : débit, latence p50/p99/max, erreurs, lag de la boucle
+asyncio pendant la charge (LoopWatchdog), puis, dans une passe séparée sous
+tracemalloc, le pic mémoire et la mémoire retenue par opération.
+
+Les résultats peuvent être enregistrés en JSON (--output) puis comparés à une
+version précédente (--compare) : une baisse de débit ou une hausse de p99 au-delà
+de --threshold est signalée, et fait échouer le script avec --fail-on-regression.
+
+Usage:
+    python benchmarks/bench_hot_paths.py --ops 2000 --concurrency 50 --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import fnmatch
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Profil de benchmark, avant l'import de la config (surchargeable par l'environnement)
+_history_dir = tempfile.mkdtemp(prefix='bench-history-')
+for _name, _value in {
+    'LOG_FILE': '',
+    'LOG_LEVEL': 'WARNING',
+    'LOG_LEVEL_DISCORD_BOT': 'WARNING',
+    'LOG_LEVEL_KEEP_ALIVE': 'WARNING',
+    'ALERT_CHANNEL_ID': '2000',
+    'ALERT_TARGETS': '',
+    'ALERT_USER_BUCKET_CAPACITY': '0',
+    'ALERT_GUILD_BUCKET_CAPACITY': '0',
+    'ALERT_CHANNEL_BUCKET_CAPACITY': '0',
+    'ALERT_HISTORY_DB': os.path.join(_history_dir, 'alert_history.db'),
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from aiohttp import ClientSession  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+import bot as bot_module  # noqa: E402
+import keep_alive  # noqa: E402
+from alert_history import alert_history  # noqa: E402
+from alert_pipeline import alert_pipeline  # noqa: E402
+from config import Config  # noqa: E402
+from fake_objects import FakeClient, FakeInteraction, FakeMember  # noqa: E402
+from rest_scheduler import rest_scheduler  # noqa: E402
+from views import MessageButtonView  # noqa: E402
+from watchdog import LoopWatchdog  # noqa: E402
+
+WEB_ROUTES = ('/', '/ping', '/status', '/healthz', '/metrics', '/stats')
+SLASH_COMMANDS = ('ping', 'hello', 'help', 'buttons', 'stats')
+# Métriques comparées entre deux versions : (clé, True si plus grand = mieux)
+COMPARED = (('throughput_ops', True), ('p99_ms', False))
+
+
+def _percentile(values, ratio: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * ratio))] * 1000 if values else float('nan')
+
+
+async def drive(op, ops: int, concurrency: int, rate: float) -> dict:
+    """Lance `ops` appels de op(i) au rythme demandé et mesure leurs latences"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = []
+
+    async def one(i: int):
+        start = time.perf_counter()
+        async with semaphore:
+            try:
+                await op(i)
+            except Exception as e:
+                errors.append(type(e).__name__)
+                return
+        latencies.append(time.perf_counter() - start)
+
+    tasks = []
+    start = time.perf_counter()
+    for i in range(ops):
+        if rate:
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(i)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'ops': ops,
+        'errors': len(errors),
+        'error_types': sorted(set(errors)),
+        'elapsed_s': round(elapsed, 3),
+        'throughput_ops': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(_percentile(latencies, 0.5), 3),
+        'p99_ms': round(_percentile(latencies, 0.99), 3),
+        'max_ms': round(latencies[-1] * 1000, 3) if latencies else float('nan'),
+    }
+
+
+async def measure(op, args) -> dict:
+    """Passe chronométrée sous LoopWatchdog, puis passe séparée sous tracemalloc"""
+    await drive(op, min(args.warmup, args.ops), args.concurrency, 0)
+
+    watchdog = LoopWatchdog(interval=0.01, stall_threshold=60, report_interval=3600)
+    watchdog.start()
+    result = await drive(op, args.ops, args.concurrency, args.rate)
+    watchdog.stop()
+    lag = watchdog.stats()
+    result['loop_lag_p99_ms'] = lag.get('p99_ms', 0.0)
+    result['loop_lag_max_ms'] = lag.get('max_ms', 0.0)
+
+    alloc_ops = min(args.alloc_ops, args.ops)
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    await drive(op, alloc_ops, args.concurrency, 0)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result['alloc_peak_kib'] = round((peak - baseline) / 1024, 1)
+    result['retained_bytes_per_op'] = round((current - baseline) / alloc_ops, 1) if alloc_ops else 0.0
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Scénarios
+# ---------------------------------------------------------------------------
+
+def build_scenarios(args, client: FakeClient, session: ClientSession, aio_base: str) -> dict:
+    view = MessageButtonView()
+    members = [
+        FakeMember(10_000 + i, client.guild, role_ids=range(i % 7, 300 + i % 7), manage_messages=True)
+        for i in range(args.members)
+    ]
+    client.add_channel(Config.ALERT_CHANNEL_ID)
+
+    def member(i: int) -> FakeMember:
+        return members[i % len(members)]
+
+    async def permissions(i: int):
+        interaction = FakeInteraction(client, member(i))
+        if not await view.check_user_permissions(interaction):
+            raise RuntimeError('permission denied')
+
+    async def alert(i: int):
+        interaction = FakeInteraction(client, member(i))
+        await view.send_message_to_channel(interaction, Config.ALERT_CHANNEL_ID, "🚨 **BENCHMARK**", "Alerte envoyée")
+        await interaction.wait_answered()
+
+    scenarios = {'permissions': permissions, 'alert': alert}
+
+    for name in SLASH_COMMANDS:
+        command = bot_module.bot.tree.get_command(name)
+
+        async def slash(i: int, command=command):
+            interaction = FakeInteraction(client, member(i))
+            await command.callback(interaction)
+            await interaction.wait_answered()
+
+        scenarios[f'slash.{name}'] = slash
+
+    flask_client = keep_alive.app.test_client()
+    for route in WEB_ROUTES:
+        def flask_get(route=route):
+            return flask_client.get(route).status_code
+
+        async def flask_route(i: int, flask_get=flask_get):
+            # Le backend Flask tourne dans un thread : même chose ici
+            status = await asyncio.to_thread(flask_get)
+            if status >= 500 and status != 503:
+                raise RuntimeError(f'HTTP {status}')
+
+        async def aio_route(i: int, route=route):
+            async with session.get(aio_base + route) as response:
+                await response.read()
+                if response.status >= 500 and response.status != 503:
+                    raise RuntimeError(f'HTTP {response.status}')
+
+        scenarios[f'web.flask.{route}'] = flask_route
+        scenarios[f'web.aiohttp.{route}'] = aio_route
+
+    return scenarios
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or 'unknown'
+    except (OSError, subprocess.SubprocessError):
+        return 'unknown'
+
+
+async def main_async(args) -> dict:
+    client = FakeClient(latency=args.latency)
+    # Latence gateway affichée par /ping
+    bot_module.bot.ws = type('FakeWebSocket', (), {'latency': 0.042})()
+
+    rest_scheduler.start()
+    alert_history.start()
+    alert_pipeline.start()
+    aio_server = TestServer(keep_alive.create_aiohttp_app())
+    await aio_server.start_server()
+    session = ClientSession()
+    aio_base = f'http://{aio_server.host}:{aio_server.port}'
+
+    scenarios = build_scenarios(args, client, session, aio_base)
+    selected = [name for name in scenarios if any(fnmatch.fnmatch(name, pattern) for pattern in args.scenarios)]
+
+    results = {}
+    try:
+        for name in selected:
+            results[name] = await measure(scenarios[name], args)
+            print_result(name, results[name])
+    finally:
+        await session.close()
+        await aio_server.close()
+        await alert_pipeline.stop()
+        await rest_scheduler.stop()
+        await asyncio.to_thread(alert_history.stop)
+        bot_module.bot.ws = None
+
+    return {
+        'meta': {
+            'revision': _git_revision(),
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'args': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        },
+        'results': results,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Affichage et comparaison
+# ---------------------------------------------------------------------------
+
+HEADER = (f"{'scénario':<24}{'ops/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+          f"{'err':>5}{'lag p99':>9}{'lag max':>9}{'pic KiB':>9}{'B/op':>8}")
+
+
+def print_result(name: str, r: dict):
+    if not getattr(print_result, 'header_done', False):
+        print(HEADER)
+        print_result.header_done = True
+    print(f"{name:<24}{r['throughput_ops']:>10.1f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['max_ms']:>9.2f}"
+          f"{r['errors']:>5}{r['loop_lag_p99_ms']:>9.2f}{r['loop_lag_max_ms']:>9.2f}"
+          f"{r['alloc_peak_kib']:>9.1f}{r['retained_bytes_per_op']:>8.0f}")
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list:
+    """Affiche les écarts avec une exécution précédente et retourne les régressions"""
+    print(f"\n== Comparaison avec {baseline['meta'].get('revision', '?')} ({baseline['meta'].get('date', '?')}) ==")
+    regressions = []
+    for name, result in report['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        cells = []
+        for key, higher_is_better in COMPARED:
+            old, new = before.get(key), result.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            flag = ' !' if worse > threshold else ''
+            if flag:
+                regressions.append((name, key, old, new))
+            cells.append(f"{key} {old:.2f} -> {new:.2f} ({change:+.0%}){flag}")
+        print(f"{name:<24}{'   '.join(cells)}")
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) au-delà de {threshold:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', nargs='+', default=['*'], help='motifs fnmatch (ex: alert "web.aiohttp.*")')
+    parser.add_argument('--ops', type=int, default=1000, help='opérations mesurées par scénario')
+    parser.add_argument('--warmup', type=int, default=100)
+    parser.add_argument('--alloc-ops', type=int, default=200, help='opérations de la passe tracemalloc')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--rate', type=float, default=0, help='opérations/seconde (0 = au plus vite)')
+    parser.add_argument('--latency', type=float, default=0.0, help='latence REST simulée (s)')
+    parser.add_argument('--members', type=int, default=500, help='membres distincts qui appuient')
+    parser.add_argument('--output', help='fichier JSON où enregistrer les résultats')
+    parser.add_argument('--compare', help='fichier JSON d\'une exécution précédente')
+    parser.add_argument('--threshold', type=float, default=0.10, help='écart toléré avant de signaler une régression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nRésultats enregistrés dans {args.output}")
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+
+    sys.exit(1 if regressions and args.fail_on_regression else 0)
+
+
+if __name__ == '__main__':
+    main()
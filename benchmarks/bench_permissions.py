@@ -0,0 +1,78 @@
+"""
+Micro-benchmark des vérifications de permission du bouton d'alerte
+
+Compare, pour des membres ayant des centaines de rôles :
+  - l'ancien algorithme (liste des rôles + any() sur une liste d'IDs autorisés)
+  - decide() sur un frozenset, sans cache
+  - PermissionCache.check(), appuis répétés du même membre
+
+Usage:
+    python benchmarks/bench_permissions.py --roles 300 --allowed 20
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from discord.utils import SnowflakeList  # noqa: E402
+from permissions import PermissionCache, decide  # noqa: E402
+
+
+def legacy_check(member, allowed_role_ids: list) -> bool:
+    user_role_ids = [role.id for role in member.roles]
+    return any(role_id in allowed_role_ids for role_id in user_role_ids)
+
+
+def make_members(count: int, roles_per_member: int, allowed: list):
+    guild = SimpleNamespace(id=1)
+    perms = SimpleNamespace(manage_messages=False)
+    members = []
+    for member_id in range(count):
+        role_ids = random.sample(range(10_000, 100_000), roles_per_member)
+        # La moitié des membres possède le dernier rôle autorisé : pire cas pour any()
+        if member_id % 2:
+            role_ids[-1] = allowed[-1]
+        members.append(SimpleNamespace(
+            id=member_id,
+            guild=guild,
+            roles=[SimpleNamespace(id=role_id) for role_id in role_ids],
+            _roles=SnowflakeList(role_ids),     # IDs bruts du payload, comme discord.Member
+            guild_permissions=perms,
+        ))
+    return members
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--members', type=int, default=200)
+    parser.add_argument('--roles', type=int, default=300)
+    parser.add_argument('--allowed', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    allowed_list = list(range(1, args.allowed + 1))
+    allowed_set = frozenset(allowed_list)
+    members = make_members(args.members, args.roles, allowed_list)
+    cache = PermissionCache()
+
+    cases = {
+        'legacy list scan': lambda: [legacy_check(m, allowed_list) for m in members],
+        'frozenset decide': lambda: [decide(m, allowed_set) for m in members],
+        'cached check': lambda: [cache.check(m, allowed_set) for m in members],
+    }
+
+    print(f"{args.members} membres x {args.roles} rôles, {args.allowed} rôles autorisés")
+    print(f"{'méthode':<20}{'µs / appui':>12}")
+    for name, func in cases.items():
+        func()  # échauffement (et remplissage du cache)
+        total = min(timeit.repeat(func, number=args.repeat, repeat=5))
+        print(f"{name:<20}{total / (args.repeat * args.members) * 1e6:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
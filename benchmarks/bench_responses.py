@@ -0,0 +1,114 @@
+"""
+Micro-benchmark des réponses en embed des commandes (ping, hello, help, buttons)
+
+Compare, pour chaque réponse, jusqu'au payload envoyé à Discord (to_dict) :
+  - l'ancienne construction (discord.Embed refait à chaque appel)
+  - EmbedTemplate.render() (responses.py), partie statique construite une fois
+
+Mesures : temps CPU par appel (timeit) et mémoire allouée par appel (pic
+tracemalloc pendant un appel, moyenné).
+
+Usage:
+    python benchmarks/bench_responses.py --repeat 20000
+"""
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import discord  # noqa: E402
+from config import Config  # noqa: E402
+from responses import BUTTONS, HELLO, HELP, PING  # noqa: E402
+
+PREFIX = Config.COMMAND_PREFIX
+MENTION = '<@123456789012345678>'
+
+
+def legacy_ping() -> discord.Embed:
+    return discord.Embed(title="🏓 Pong!", description=f"Latence: {42}ms", color=discord.Color.green())
+
+
+def legacy_hello() -> discord.Embed:
+    return discord.Embed(title="👋 Salut!", description=f"Bonjour {MENTION}! Comment allez-vous?",
+                         color=discord.Color.blue())
+
+
+def legacy_help() -> discord.Embed:
+    embed = discord.Embed(
+        title="📚 Aide - Alerte Percepteur",
+        description="Voici les commandes disponibles:",
+        color=discord.Color.purple()
+    )
+    embed.add_field(
+        name="Commandes Slash",
+        value="`/ping` - Teste la latence\n"
+              "`/hello` - Salue l'utilisateur\n"
+              "`/buttons` - Affiche les boutons interactifs\n"
+              "`/stats` - Statistiques des alertes\n"
+              "`/help` - Affiche cette aide",
+        inline=False
+    )
+    embed.add_field(
+        name="Commandes Préfixe",
+        value=f"`{PREFIX}ping` - Teste la latence\n"
+              f"`{PREFIX}hello` - Salue l'utilisateur",
+        inline=False
+    )
+    embed.set_footer(text="Alerte Percepteur - Bot créé avec discord.py")
+    return embed
+
+
+def legacy_buttons() -> discord.Embed:
+    return discord.Embed(
+        title="🚨 Alerte Percepteur🚨",
+        description="😎 Ce Bot codé par Viti vous permet de ping rapidement les niveaux 200 en cas d'attaque ! 😎",
+        color=discord.Color.orange()
+    )
+
+
+# Réponse -> (ancienne construction, rendu par modèle)
+CASES = {
+    'ping': (legacy_ping, lambda: PING.render('fr', latency=42)),
+    'hello': (legacy_hello, lambda: HELLO.render('fr', mention=MENTION)),
+    'help': (legacy_help, lambda: HELP.render('fr')),
+    'buttons': (legacy_buttons, lambda: BUTTONS.render('fr')),
+}
+
+
+def bytes_per_call(build, calls: int) -> float:
+    """Pic tracemalloc d'un appel (construction + to_dict), moyenné"""
+    total = 0
+    tracemalloc.start()
+    for _ in range(calls):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        build().to_dict()
+        total += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+    return total / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20000)
+    parser.add_argument('--alloc-calls', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'réponse':<10}{'ancien µs':>11}{'modèle µs':>11}{'gain':>7}{'ancien B':>10}{'modèle B':>10}")
+    for name, (legacy, template) in CASES.items():
+        # Même payload envoyé à Discord
+        assert legacy().to_dict() == template().to_dict(), name
+        legacy_us = timeit.timeit(lambda: legacy().to_dict(), number=args.repeat) / args.repeat * 1e6
+        template_us = timeit.timeit(lambda: template().to_dict(), number=args.repeat) / args.repeat * 1e6
+        legacy_bytes = bytes_per_call(legacy, args.alloc_calls)
+        template_bytes = bytes_per_call(template, args.alloc_calls)
+        print(f"{name:<10}{legacy_us:>11.2f}{template_us:>11.2f}{legacy_us / template_us:>6.1f}x"
+              f"{legacy_bytes:>10.0f}{template_bytes:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
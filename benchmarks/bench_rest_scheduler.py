@@ -0,0 +1,126 @@
+"""
+Simulation de l'ordonnanceur REST contre un faux serveur Discord
+
+Envoie une rafale mêlant alertes (un channel), confirmations et trafic
+cosmétique (plusieurs channels) avec le vrai client HTTP de discord.py,
+pointé sur benchmarks/fake_discord.py qui injecte latence et 429. Compare
+l'envoi direct (tout en parallèle) et l'envoi via RestScheduler, et affiche
+la latence p50/p99 par priorité, les envois abandonnés et les 429 reçus.
+
+Le script échoue (code 1) si une alerte n'a pas été livrée via l'ordonnanceur.
+
+Usage:
+    python benchmarks/bench_rest_scheduler.py --alerts 20 --cosmetic 200 --rate-limit 0.1
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import discord  # noqa: E402
+from discord.http import HTTPClient, Route, handle_message_parameters  # noqa: E402
+from fake_discord import FakeDiscord  # noqa: E402
+from rest_scheduler import Priority, RequestDropped, RestScheduler  # noqa: E402
+
+ALERT_CHANNEL = 1
+INTERACTION_CHANNEL = 2
+COSMETIC_CHANNELS = range(100, 110)
+
+
+def build_workload(alerts: int, interactions: int, cosmetic: int, seed: int):
+    """Liste mélangée de (priorité, channel)"""
+    jobs = [(Priority.ALERT, ALERT_CHANNEL)] * alerts
+    jobs += [(Priority.INTERACTION, INTERACTION_CHANNEL)] * interactions
+    jobs += [(Priority.COSMETIC, random.Random(seed + i).choice(COSMETIC_CHANNELS)) for i in range(cosmetic)]
+    random.Random(seed).shuffle(jobs)
+    return jobs
+
+
+async def run_scenario(name: str, http: HTTPClient, jobs, scheduler: RestScheduler = None):
+    latencies = defaultdict(list)
+    dropped = defaultdict(int)
+    failed = defaultdict(int)
+
+    async def send(priority: Priority, channel_id: int):
+        start = time.perf_counter()
+        factory = lambda: http.send_message(channel_id, params=handle_message_parameters(content='x'))  # noqa: E731
+        try:
+            if scheduler is None:
+                await factory()
+            else:
+                await scheduler.run(priority, f'channel:{channel_id}', factory)
+        except RequestDropped:
+            dropped[priority] += 1
+            return
+        except discord.HTTPException:
+            failed[priority] += 1
+            return
+        latencies[priority].append(time.perf_counter() - start)
+
+    if scheduler is not None:
+        scheduler.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(send(priority, channel_id) for priority, channel_id in jobs))
+    elapsed = time.perf_counter() - start
+    if scheduler is not None:
+        await scheduler.stop()
+
+    print(f"\n== {name} ({elapsed:.2f}s) ==")
+    print(f"{'priorité':<13}{'livrés':>8}{'abandonnés':>12}{'échecs':>8}{'p50 (ms)':>11}{'p99 (ms)':>11}")
+    for priority in Priority:
+        values = sorted(latencies[priority])
+        p50 = values[len(values) // 2] * 1000 if values else float('nan')
+        p99 = values[min(len(values) - 1, int(len(values) * 0.99))] * 1000 if values else float('nan')
+        print(f"{priority.name:<13}{len(values):>8}{dropped[priority]:>12}{failed[priority]:>8}{p50:>11.1f}{p99:>11.1f}")
+    return latencies, dropped, failed
+
+
+async def main_async(args):
+    server = FakeDiscord(latency=args.latency, rate_limit_ratio=args.rate_limit, retry_after=args.retry_after)
+    Route.BASE = await server.start()
+    http = HTTPClient(asyncio.get_running_loop())
+    await http.static_login('fake-token')
+
+    jobs = build_workload(args.alerts, args.interactions, args.cosmetic, args.seed)
+    try:
+        await run_scenario('direct (sans ordonnanceur)', http, jobs)
+        _, dropped, failed = await run_scenario(
+            'RestScheduler', http, jobs,
+            RestScheduler(concurrency=args.concurrency, max_queue=args.queue)
+        )
+    finally:
+        print(f"\n429 injectés par le faux serveur: {sum(server.rate_limited.values())}")
+        await http.close()
+        await server.stop()
+
+    return dropped[Priority.ALERT] == 0 and failed[Priority.ALERT] == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--alerts', type=int, default=20)
+    parser.add_argument('--interactions', type=int, default=20)
+    parser.add_argument('--cosmetic', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05, help='latence du faux serveur (s)')
+    parser.add_argument('--rate-limit', type=float, default=0.1, help='proportion de réponses 429')
+    parser.add_argument('--retry-after', type=float, default=0.3)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--queue', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    ok = asyncio.run(main_async(args))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
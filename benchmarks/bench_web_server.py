@@ -0,0 +1,110 @@
+"""
+Benchmark local du serveur keep-alive : Flask (thread) contre aiohttp (asyncio)
+
+Chaque backend est lancé dans un sous-processus, puis bombardé de requêtes
+/ping concurrentes par un client aiohttp. On mesure les requêtes/seconde et
+la latence p50/p99.
+
+Usage:
+    python benchmarks/bench_web_server.py --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def serve(backend: str, port: int):
+    """Lance un backend au premier plan (appelé dans le sous-processus)"""
+    import keep_alive
+
+    if backend == 'flask':
+        keep_alive.run(port)
+    else:
+        async def _serve():
+            runner = await keep_alive.start_async_web_server(port)
+            try:
+                await asyncio.Event().wait()
+            finally:
+                await keep_alive.stop_async_web_server(runner)
+        asyncio.run(_serve())
+
+
+async def wait_for_port(port: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError(f"Le serveur n'écoute pas sur le port {port}")
+
+
+async def load(port: int, total: int, concurrency: int):
+    import aiohttp
+
+    url = f'http://127.0.0.1:{port}/ping'
+    latencies = []
+    remaining = iter(range(total))
+
+    async with aiohttp.ClientSession(headers={'User-Agent': 'bench/1.0'}) as session:
+        async def worker():
+            for _ in remaining:
+                start = time.perf_counter()
+                async with session.get(url) as resp:
+                    await resp.read()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'rps': total / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def bench(backend: str, port: int, total: int, concurrency: int):
+    proc = subprocess.Popen(
+        [sys.executable, __file__, '--serve', backend, '--port', str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(wait_for_port(port))
+        return asyncio.run(load(port, total, concurrency))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--serve', choices=('flask', 'aiohttp'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    print(f"{'backend':<10}{'req/s':>10}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    for offset, backend in enumerate(('flask', 'aiohttp')):
+        result = bench(backend, args.port + offset, args.requests, args.concurrency)
+        print(f"{backend:<10}{result['rps']:>10.0f}{result['p50_ms']:>12.2f}{result['p99_ms']:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Faux serveur HTTP Discord, pour tester les envois sans connexion réelle
+
+Sert GET /api/v10/users/@me et POST/PATCH sur /channels/{id}/messages avec
+une latence configurable et une proportion de réponses 429 (avec les en-têtes
+que discord.py attend d'une vraie réponse de rate limit).
+
+Usage dans un script :
+    server = FakeDiscord(latency=0.05, rate_limit_ratio=0.1)
+    base_url = await server.start()
+    ...
+    await server.stop()
+"""
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter
+from aiohttp import web
+
+API_PREFIX = '/api/v10'
+
+
+class FakeDiscord:
+    def __init__(self, latency: float = 0.05, jitter: float = 0.02,
+                 rate_limit_ratio: float = 0.0, retry_after: float = 0.5, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.requests = Counter()
+        self.rate_limited = Counter()
+        self.timeline = []
+        self._ids = itertools.count(1_000_000_000_000_000_000)
+        self._runner = None
+
+    async def _delay(self):
+        await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+
+    def _rate_limit_response(self, route: str) -> web.Response:
+        self.rate_limited[route] += 1
+        return web.json_response(
+            {'message': 'You are being rate limited.', 'retry_after': self.retry_after, 'global': False},
+            status=429,
+            headers={
+                'Via': '1.1 google',
+                'Retry-After': str(self.retry_after),
+                'X-RateLimit-Limit': '5',
+                'X-RateLimit-Remaining': '0',
+                'X-RateLimit-Reset-After': str(self.retry_after),
+                'X-RateLimit-Bucket': route,
+            },
+        )
+
+    async def me(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            'id': '1', 'username': 'fake-bot', 'discriminator': '0000',
+            'avatar': None, 'bot': True, 'flags': 0,
+        })
+
+    async def message(self, request: web.Request) -> web.Response:
+        channel_id = request.match_info['channel_id']
+        route = f'channel:{channel_id}'
+        self.requests[route] += 1
+        await self._delay()
+        if self.random.random() < self.rate_limit_ratio:
+            return self._rate_limit_response(route)
+        self.timeline.append((time.perf_counter(), route, request.method))
+        message_id = request.match_info.get('message_id') or str(next(self._ids))
+        return web.json_response(
+            {
+                'id': message_id, 'channel_id': channel_id, 'type': 0, 'content': '',
+                'author': {'id': '1', 'username': 'fake-bot', 'discriminator': '0000', 'avatar': None},
+                'embeds': [], 'attachments': [], 'mentions': [], 'mention_roles': [],
+                'pinned': False, 'mention_everyone': False, 'tts': False,
+                'timestamp': '2025-01-01T00:00:00+00:00', 'edited_timestamp': None, 'flags': 0,
+            },
+            headers={
+                'X-RateLimit-Limit': '5',
+                'X-RateLimit-Remaining': '4',
+                'X-RateLimit-Reset-After': '1',
+                'X-RateLimit-Bucket': route,
+            },
+        )
+
+    async def start(self, port: int = 0) -> str:
+        """Démarre le serveur et retourne l'URL de base de l'API"""
+        app = web.Application()
+        app.router.add_get(f'{API_PREFIX}/users/@me', self.me)
+        app.router.add_post(f'{API_PREFIX}/channels/{{channel_id}}/messages', self.message)
+        app.router.add_patch(f'{API_PREFIX}/channels/{{channel_id}}/messages/{{message_id}}', self.message)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        return f'http://127.0.0.1:{bound_port}{API_PREFIX}'
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
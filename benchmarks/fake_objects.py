@@ -0,0 +1,176 @@
+"""
+Faux objets discord.py en mémoire, pour exécuter les vues et les commandes sans gateway
+
+Les faux membres et channels héritent des vraies classes (les isinstance du
+bot passent) sans appeler leur constructeur ; les appels REST (send, edit,
+defer, follow-up) attendent `latency` secondes au lieu de partir sur le réseau.
+
+Usage dans un script :
+    client = FakeClient(latency=0.02)
+    channel = client.add_channel(1234)
+    member = FakeMember(42, client.guild, role_ids=[1, 2, 3])
+    interaction = FakeInteraction(client, member)
+    await interaction.wait_answered()
+"""
+import asyncio
+import itertools
+from types import SimpleNamespace
+from typing import Dict, Iterable, Optional
+import discord
+
+_ids = itertools.count(1_100_000_000_000_000_000)
+
+
+async def _rest_call(latency: float):
+    if latency > 0:
+        await asyncio.sleep(latency)
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int = 1, me=None):
+        self.id = guild_id
+        self.name = f'guild-{guild_id}'
+        self.me = me
+        self._channels: Dict[int, 'FakeTextChannel'] = {}
+
+    def get_channel(self, channel_id: int):
+        return self._channels.get(channel_id)
+
+
+class FakeMessage:
+    def __init__(self, channel: 'FakeTextChannel', embed: Optional[discord.Embed], latency: float):
+        self.id = next(_ids)
+        self.channel = channel
+        self.embed = embed
+        self.edits = 0
+        self._latency = latency
+
+    @property
+    def jump_url(self) -> str:
+        return f'https://discord.com/channels/{self.channel.guild.id}/{self.channel.id}/{self.id}'
+
+    async def edit(self, *, embed: Optional[discord.Embed] = None, **kwargs):
+        await _rest_call(self._latency)
+        self.embed = embed
+        self.edits += 1
+        return self
+
+
+class FakeTextChannel(discord.TextChannel):
+    """Channel texte dont send() ne fait qu'attendre la latence simulée"""
+
+    def __init__(self, channel_id: int, guild: FakeGuild, latency: float = 0.0, can_send: bool = True):
+        self.id = channel_id
+        self.guild = guild
+        self.name = f'channel-{channel_id}'
+        self.sent = 0
+        self._latency = latency
+        self._can_send = can_send
+
+    def permissions_for(self, obj) -> discord.Permissions:
+        return discord.Permissions(send_messages=self._can_send)
+
+    async def send(self, content: Optional[str] = None, *, embed: Optional[discord.Embed] = None, **kwargs):
+        await _rest_call(self._latency)
+        self.sent += 1
+        return FakeMessage(self, embed, self._latency)
+
+
+class FakeMember(discord.Member):
+    """Membre d'un serveur avec ses rôles et permissions, sans état de connexion"""
+
+    def __init__(self, member_id: int, guild: FakeGuild, role_ids: Iterable[int] = (),
+                 manage_messages: bool = True):
+        self.guild = guild
+        self._fake_id = member_id
+        self._fake_roles = [SimpleNamespace(id=role_id) for role_id in role_ids]
+        self._fake_permissions = discord.Permissions(manage_messages=manage_messages)
+
+    id = property(lambda self: self._fake_id)
+    name = property(lambda self: f'user{self._fake_id}')
+    display_name = property(lambda self: f'User {self._fake_id}')
+    mention = property(lambda self: f'<@{self._fake_id}>')
+    display_avatar = property(lambda self: SimpleNamespace(url='https://cdn.discordapp.com/embed/avatars/0.png'))
+    roles = property(lambda self: self._fake_roles)
+    guild_permissions = property(lambda self: self._fake_permissions)
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __repr__(self) -> str:
+        return f'<FakeMember id={self._fake_id}>'
+
+
+class FakeResponse:
+    def __init__(self, interaction: 'FakeInteraction'):
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def send_message(self, content: Optional[str] = None, **kwargs):
+        await _rest_call(self._interaction.client.latency_rest)
+        self._done = True
+        self._interaction.answer(content, kwargs)
+
+    async def defer(self, **kwargs):
+        await _rest_call(self._interaction.client.latency_rest)
+        self._done = True
+
+
+class FakeFollowup:
+    def __init__(self, interaction: 'FakeInteraction'):
+        self._interaction = interaction
+
+    async def send(self, content: Optional[str] = None, **kwargs):
+        await _rest_call(self._interaction.client.latency_rest)
+        self._interaction.answer(content, kwargs)
+
+
+class FakeInteraction:
+    """Interaction (bouton ou slash) ; `wait_answered` rend la main au premier message envoyé"""
+
+    def __init__(self, client: 'FakeClient', user: FakeMember, channel_id: Optional[int] = None):
+        self.id = next(_ids)
+        self.client = client
+        self.user = user
+        self.guild_id = user.guild.id
+        self.channel_id = channel_id
+        self.type = discord.InteractionType.component
+        self.data = {}
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.answers = []
+        self._answered = asyncio.Event()
+
+    def answer(self, content: Optional[str], kwargs: dict):
+        self.answers.append((content, kwargs))
+        self._answered.set()
+
+    async def wait_answered(self, timeout: float = 30):
+        await asyncio.wait_for(self._answered.wait(), timeout)
+
+
+class FakeClient:
+    """Client minimal : cache de channels et latence REST simulée"""
+
+    def __init__(self, latency: float = 0.0, guild_id: int = 1):
+        self.latency_rest = latency
+        self.guild = FakeGuild(guild_id)
+        self.user = SimpleNamespace(id=0, name='fake-bot')
+
+    def add_channel(self, channel_id: int, can_send: bool = True) -> FakeTextChannel:
+        channel = FakeTextChannel(channel_id, self.guild, self.latency_rest, can_send)
+        self.guild._channels[channel_id] = channel
+        return channel
+
+    def get_channel(self, channel_id: int):
+        return self.guild.get_channel(channel_id)
+
+    async def fetch_channel(self, channel_id: int):
+        await _rest_call(self.latency_rest)
+        channel = self.get_channel(channel_id)
+        if channel is None:
+            raise discord.NotFound(SimpleNamespace(status=404, reason='Not Found'), 'Unknown Channel')
+        return channel
@@ -1,69 +1,343 @@
+import time
+# Startup phases are timed from here, before the heavy imports
+from startup_profile import startup_profile
+from config import Config, ConfigSnapshot
+startup_profile.mark('config')
+
 import discord
 from discord.ext import commands
+from discord.backoff import ExponentialBackoff
+from discord.gateway import DiscordWebSocket, ReconnectWebSocket
+import aiohttp
 import asyncio
 import logging
 import os
+import yarl
+from typing import Optional
 from dotenv import load_dotenv
 from views import MessageButtonView
-from config import Config
-from keep_alive import start_web_server
+from alert_pipeline import alert_pipeline
+from alert_history import alert_history
+from permissions import permission_cache
+from channels import channel_registry
+from command_sync import sync_if_changed
+from health import HealthPublisher
+from metrics import count_error, rate_limit_trace, timed
+from watchdog import LoopWatchdog
+from rest_scheduler import rest_scheduler
+from config_reload import ConfigWatcher
+from cache_profile import client_options
+from gateway_session import GatewaySessionStore, SessionState, cache_guild, close_resumable, mark_ready
+from ratelimit import alert_buckets, alert_rate_limiter
+from log_setup import apply_log_levels, setup_logging
+from probe_stats import probe_stats
+from responses import BUTTONS, HELLO, HELP, PING, locale_of
+startup_profile.mark('imports')
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('bot.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging (non-blocking queue + batched, rotating file writer)
+log_writer = setup_logging()
 logger = logging.getLogger('discord_bot')
+startup_profile.mark('logging')
+
+# Event-loop lag watchdog, also drives the periodic summary logs
+watchdog = LoopWatchdog(
+    interval=Config.WATCHDOG_INTERVAL,
+    stall_threshold=Config.WATCHDOG_STALL_SECONDS,
+    report_interval=Config.PROBE_SUMMARY_SECONDS
+)
 
 class DiscordBot(commands.Bot):
     def __init__(self):
-        intents = discord.Intents.default()
-        intents.message_content = True
-        intents.guilds = True
-        
         super().__init__(
-            command_prefix=Config.COMMAND_PREFIX,
-            intents=intents,
-            help_command=None
+            # Read on every message so a reloaded prefix applies immediately
+            command_prefix=lambda bot, message: Config.COMMAND_PREFIX,
+            # Intents and caches (messages, members, chunking) from CACHE_PROFILE
+            **client_options(),
+            help_command=None,
+            # Presence is sent with IDENTIFY instead of a separate update in on_ready
+            activity=discord.Activity(
+                type=discord.ActivityType.watching,
+                name="les alertes et notifications"
+            ),
+            status=discord.Status.online,
+            # Long 429 waits are handed back to the REST scheduler instead of blocking
+            max_ratelimit_timeout=Config.REST_MAX_RATELIMIT_WAIT,
+            # Counts every 429 response of the REST API (discord_rest_ratelimited_total)
+            http_trace=rate_limit_trace()
+        )
+        self.start_time: float = time.perf_counter()
+        self.ready_logged = False
+        # Fast restart: gateway session saved for the next process
+        self.session_store = GatewaySessionStore(
+            Config.GATEWAY_SESSION_FILE,
+            save_interval=Config.GATEWAY_SESSION_SAVE_SECONDS,
+            max_age=Config.GATEWAY_SESSION_MAX_AGE
         )
+        self.session_resumed = False
+        self.connect_started: Optional[float] = None
+        self.command_sync_task: Optional[asyncio.Task] = None
+        self.first_interaction_logged = False
+        self.health = HealthPublisher(self, Config.HEALTH_PUBLISH_SECONDS, loop_stats=watchdog.stats)
+        self.config_watcher = ConfigWatcher(Config.CONFIG_FILE, Config.CONFIG_RELOAD_SECONDS)
+        self.config_watcher.listeners.append(self.on_config_reload)
+    
+    async def login(self, token: str):
+        """Timed for the startup profile (setup_hook runs inside the login)"""
+        with startup_profile.phase('login'):
+            await super().login(token)
     
     async def setup_hook(self):
         """Called when the bot is starting up"""
+        setup_start = time.perf_counter()
         logger.info("Bot is starting up...")
+        logger.info(f"Cache profile: {Config.CACHE_PROFILE}, intents: {self.intents.value}"
+                    f"{' (slash-only, prefix commands disabled)' if Config.SLASH_ONLY else ''}")
         
         # Add the persistent view for button interactions
         self.add_view(MessageButtonView())
         
-        # Sync slash commands
+        # Start the priority-aware outbound REST scheduler
+        rest_scheduler.start()
+        
+        # Start the alert history writer, then the background alert delivery workers
+        alert_history.start()
+        alert_pipeline.start()
+        
+        # Periodically save the gateway session so a restart can resume it
+        if Config.GATEWAY_RESUME:
+            self.session_store.start(self)
+        
+        # Publish bot state snapshots for /status and /healthz
+        self.health.start()
+        
+        # Apply edits of the config file without reconnecting
+        self.config_watcher.start()
+        
+        # Sync slash commands in the background: the gateway connection doesn't wait for it
+        self.command_sync_task = asyncio.create_task(self.sync_commands(), name='command-sync')
+        startup_profile.record('setup_hook', setup_start)
+    
+    async def sync_commands(self):
+        """Sync slash commands, only when the command tree changed"""
         try:
-            synced = await self.tree.sync()
-            logger.info(f"Synced {len(synced)} command(s)")
+            sync_start = time.perf_counter()
+            synced = await sync_if_changed(
+                self.tree,
+                self.application_id,
+                Config.COMMAND_SYNC_STATE_FILE,
+                force=Config.FORCE_COMMAND_SYNC
+            )
+            startup_profile.record('command sync', sync_start)
+            if synced:
+                logger.info(f"Command sync took {time.perf_counter() - sync_start:.2f}s")
         except Exception as e:
             logger.error(f"Failed to sync commands: {e}")
     
+    async def close(self):
+        """Flush pending alerts before disconnecting"""
+        self.config_watcher.stop()
+        self.session_store.stop()
+        if self.command_sync_task is not None and not self.command_sync_task.done():
+            self.command_sync_task.cancel()
+        await alert_pipeline.stop()
+        await rest_scheduler.stop()
+        await asyncio.to_thread(alert_history.stop)
+        self.health.on_disconnect()
+        self.health.stop()
+        # Saved last: events keep arriving while the pipeline drains, a stale sequence would replay them
+        if Config.GATEWAY_RESUME and self.ws is not None:
+            self.keep_gateway_session(self.ws)
+        await super().close()
+    
+    def keep_gateway_session(self, ws: DiscordWebSocket):
+        """Save the session and make the coming close keep it resumable"""
+        if ws.session_id is None:
+            return
+        self.session_store.save(ws)
+        close_resumable(ws)
+        logger.info(f"Gateway session {ws.session_id} saved at sequence {ws.sequence} for the next start")
+    
+    async def connect(self, *, reconnect: bool = True):
+        """Resume the previous process' gateway session when possible, then run the normal gateway loop"""
+        if self.connect_started is None:
+            self.connect_started = time.perf_counter()
+        state = self.session_store.load() if Config.GATEWAY_RESUME else None
+        if state is not None:
+            await self.resume_stored_session(state, reconnect=reconnect)
+            if self.is_closed():
+                return
+        await super().connect(reconnect=reconnect)
+    
+    async def resume_stored_session(self, state: SessionState, reconnect: bool = True):
+        """
+        Send RESUME with the stored session and poll it until the connection ends
+        
+        Discord asking to resume again is followed. Until Discord has accepted the
+        stored session, any other failure (invalidated session, closed connection,
+        timeout...) hands over to the library's connection loop, which identifies
+        with a new session. Once accepted, a dropped connection is handled like
+        Client.connect does: resume after a backoff, stop on fatal close codes.
+        """
+        logger.info(f"Resuming stored gateway session {state.session_id} at sequence {state.sequence}")
+        backoff = ExponentialBackoff()
+        gateway, session, sequence = yarl.URL(state.resume_url), state.session_id, state.sequence
+        while not self.is_closed():
+            try:
+                coro = DiscordWebSocket.from_client(
+                    self,
+                    gateway=gateway,
+                    shard_id=self.shard_id,
+                    session=session,
+                    sequence=sequence,
+                    resume=True
+                )
+                self.ws = await asyncio.wait_for(coro, timeout=60.0)
+                while True:
+                    await self.ws.poll_event()
+            except ReconnectWebSocket as e:
+                self.dispatch('disconnect')
+                if e.resume:
+                    gateway, session, sequence = self.ws.gateway, self.ws.session_id, self.ws.sequence
+                    continue
+                self.session_store.clear()
+                logger.warning("Stored gateway session was invalidated, identifying instead")
+                return
+            except (OSError, discord.HTTPException, discord.RateLimited, discord.GatewayNotFound,
+                    discord.ConnectionClosed, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.dispatch('disconnect')
+                if self.is_closed():
+                    return
+                if not self.session_resumed:
+                    logger.warning(f"Gateway session could not be resumed ({type(e).__name__}: {e}), identifying instead")
+                    return
+                # Same handling as Client.connect once the session is established
+                if not reconnect:
+                    await self.close()
+                    if isinstance(e, discord.ConnectionClosed) and e.code == 1000:
+                        return
+                    raise
+                if isinstance(e, discord.ConnectionClosed):
+                    if e.code == 4014:
+                        raise discord.PrivilegedIntentsRequired(e.shard_id) from None
+                    if e.code != 1000:
+                        await self.close()
+                        raise
+                gateway, session, sequence = self.ws.gateway, self.ws.session_id, self.ws.sequence
+                # Connection reset by peer: resume right away
+                if isinstance(e, OSError) and e.errno in (54, 10054):
+                    continue
+                retry = backoff.delay()
+                logger.warning(f"Gateway connection lost ({type(e).__name__}: {e}), resuming in {retry:.2f}s")
+                await asyncio.sleep(retry)
+    
+    async def warm_cache_after_resume(self):
+        """
+        A session resumed from a previous process never received READY: load the
+        guilds and their channels over REST, then mark the client ready
+        """
+        warm_start = time.perf_counter()
+        try:
+            async for partial in self.fetch_guilds(limit=None):
+                guild = await self.fetch_guild(partial.id)
+                cache_guild(self, guild, await guild.fetch_channels())
+        except (discord.HTTPException, discord.RateLimited) as e:
+            logger.warning(f"Could not load guild state after resume: {e}")
+        except Exception as e:
+            logger.error(f"Could not load guild state after resume: {type(e).__name__} {e}")
+        finally:
+            # Whatever failed, the client must become ready (wait_until_ready, on_ready)
+            permission_cache.clear()
+            startup_profile.record('resume cache warm-up', warm_start)
+            logger.info(f"Loaded {len(self.guilds)} guild(s) over REST in {time.perf_counter() - warm_start:.2f}s")
+            if not self.is_closed():
+                mark_ready(self)
+    
+    async def on_config_reload(self, old: ConfigSnapshot, new: ConfigSnapshot):
+        """Push a reloaded configuration to the long-lived caches"""
+        if (old.ALLOWED_ROLE_IDS, old.PERMISSION_CACHE_TTL) != (new.ALLOWED_ROLE_IDS, new.PERMISSION_CACHE_TTL):
+            permission_cache.ttl = new.PERMISSION_CACHE_TTL
+            permission_cache.clear()
+        
+        buckets = ('CAPACITY', 'REFILL_SECONDS')
+        if any(getattr(old, f'ALERT_{scope}_BUCKET_{kind}') != getattr(new, f'ALERT_{scope}_BUCKET_{kind}')
+               for scope in ('USER', 'GUILD', 'CHANNEL') for kind in buckets):
+            alert_rate_limiter.reconfigure(**alert_buckets(new))
+        
+        alert_pipeline.coalescer.window = new.ALERT_COALESCE_SECONDS
+        alert_pipeline.fanout_concurrency = max(1, new.ALERT_FANOUT_CONCURRENCY)
+        alert_pipeline.target_timeout = new.ALERT_TARGET_TIMEOUT
+        apply_log_levels(new)
+        
+        new_channels = set(new.target_channel_ids()) - set(old.target_channel_ids())
+        if new_channels:
+            await channel_registry.resolve_all(self, new_channels)
+    
+    async def on_connect(self):
+        """Gateway connected (first connection or reconnect)"""
+        self.health.on_connect()
+    
+    async def on_resumed(self):
+        """Gateway session resumed"""
+        self.health.on_resumed()
+        if not self.is_ready() and not self.session_resumed:
+            # Resumed the session of a previous process: no guild state yet
+            self.session_resumed = True
+            logger.info(f"Startup to resumed: {time.perf_counter() - self.start_time:.2f}s")
+            asyncio.create_task(self.warm_cache_after_resume(), name='resume-cache-warmup')
+    
+    async def on_disconnect(self):
+        """Gateway connection lost"""
+        self.health.on_disconnect()
+    
     async def on_ready(self):
         """Called when the bot is ready"""
         logger.info(f'{self.user} has connected to Discord!')
         logger.info(f'Bot is in {len(self.guilds)} guilds')
+        ready_start = time.perf_counter()
+        first_ready = not self.ready_logged
+        if first_ready:
+            self.ready_logged = True
+            if self.connect_started is not None:
+                startup_profile.record('gateway', self.connect_started, ready_start)
+            logger.info(f"Startup to ready: {ready_start - self.start_time:.2f}s")
         
-        # Set bot status
-        await self.change_presence(
-            activity=discord.Activity(
-                type=discord.ActivityType.watching,
-                name="les alertes et notifications"
-            ),
-            status=discord.Status.online
-        )
+        # Resolve and pre-validate the configured target channels
+        await channel_registry.resolve_all(self, Config.target_channel_ids())
+        if first_ready:
+            startup_profile.record('on_ready', ready_start)
+            if Config.STARTUP_PROFILE:
+                startup_profile.log_report()
+    
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        """Invalidate the cached permission decision of an updated member"""
+        permission_cache.invalidate_member(after.guild.id, after.id)
+        if self.user and after.id == self.user.id:
+            channel_registry.refresh_guild(after.guild)
+    
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        """Role permissions changed: drop the guild's cached decisions"""
+        permission_cache.invalidate_guild(after.guild.id)
+        channel_registry.refresh_guild(after.guild)
+    
+    async def on_guild_role_delete(self, role: discord.Role):
+        """Role removed: drop the guild's cached decisions"""
+        permission_cache.invalidate_guild(role.guild.id)
+        channel_registry.refresh_guild(role.guild)
+    
+    async def on_guild_channel_update(self, before, after):
+        """Channel or permission overwrites changed: refresh its registry entry"""
+        channel_registry.refresh_channel(after)
+    
+    async def on_guild_channel_delete(self, channel):
+        """Forget deleted target channels"""
+        channel_registry.remove(channel.id)
     
     async def on_command_error(self, ctx, error):
         """Handle command errors"""
+        count_error(type(error).__name__)
         if isinstance(error, commands.CommandNotFound):
             await ctx.send("❌ Commande non trouvée. Utilisez `/help` pour voir les commandes disponibles.")
         elif isinstance(error, commands.MissingPermissions):
@@ -79,93 +353,88 @@ bot = DiscordBot()
 
 # Traditional prefix commands
 @bot.command(name='ping')
+@timed('ping_command')
 async def ping_command(ctx):
     """Commande ping pour tester la latence du bot"""
-    latency = round(bot.latency * 1000)
-    embed = discord.Embed(
-        title="🏓 Pong!",
-        description=f"Latence: {latency}ms",
-        color=discord.Color.green()
-    )
-    await ctx.send(embed=embed)
+    await ctx.send(embed=PING.render(locale_of(ctx), latency=round(bot.latency * 1000)))
 
 @bot.command(name='hello')
+@timed('hello_command')
 async def hello_command(ctx):
     """Commande pour saluer l'utilisateur"""
-    embed = discord.Embed(
-        title="👋 Salut!",
-        description=f"Bonjour {ctx.author.mention}! Comment allez-vous?",
-        color=discord.Color.blue()
-    )
-    await ctx.send(embed=embed)
+    await ctx.send(embed=HELLO.render(locale_of(ctx), mention=ctx.author.mention))
 
 # Slash commands
 @bot.tree.command(name="ping", description="Teste la latence du bot")
+@timed('ping_slash')
 async def ping_slash(interaction: discord.Interaction):
     """Slash command pour ping"""
-    latency = round(bot.latency * 1000)
-    embed = discord.Embed(
-        title="🏓 Pong!",
-        description=f"Latence: {latency}ms",
-        color=discord.Color.green()
-    )
-    await interaction.response.send_message(embed=embed)
+    await interaction.response.send_message(embed=PING.render(locale_of(interaction), latency=round(bot.latency * 1000)))
 
 @bot.tree.command(name="hello", description="Salue l'utilisateur")
+@timed('hello_slash')
 async def hello_slash(interaction: discord.Interaction):
     """Slash command pour hello"""
-    embed = discord.Embed(
-        title="👋 Salut!",
-        description=f"Bonjour {interaction.user.mention}! Comment allez-vous?",
-        color=discord.Color.blue()
-    )
-    await interaction.response.send_message(embed=embed)
+    await interaction.response.send_message(embed=HELLO.render(locale_of(interaction), mention=interaction.user.mention))
 
 @bot.tree.command(name="help", description="Affiche l'aide du bot")
+@timed('help_slash')
 async def help_slash(interaction: discord.Interaction):
     """Slash command pour l'aide"""
-    embed = discord.Embed(
-        title="📚 Aide - Alerte Percepteur",
-        description="Voici les commandes disponibles:",
-        color=discord.Color.purple()
-    )
-    
-    embed.add_field(
-        name="Commandes Slash",
-        value="`/ping` - Teste la latence\n"
-              "`/hello` - Salue l'utilisateur\n"
-              "`/buttons` - Affiche les boutons interactifs\n"
-              "`/help` - Affiche cette aide",
-        inline=False
-    )
-    
-    embed.add_field(
-        name="Commandes Préfixe",
-        value=f"`{Config.COMMAND_PREFIX}ping` - Teste la latence\n"
-              f"`{Config.COMMAND_PREFIX}hello` - Salue l'utilisateur",
-        inline=False
-    )
-    
-    embed.set_footer(text="Alerte Percepteur - Bot créé avec discord.py")
-    await interaction.response.send_message(embed=embed)
+    await interaction.response.send_message(embed=HELP.render(locale_of(interaction)))
 
 @bot.tree.command(name="buttons", description="Affiche les boutons interactifs")
+@timed('buttons_slash')
 async def buttons_slash(interaction: discord.Interaction):
     """Slash command pour afficher les boutons"""
+    view = MessageButtonView()
+    await interaction.response.send_message(embed=BUTTONS.render(locale_of(interaction)), view=view)
+
+@bot.tree.command(name="stats", description="Statistiques des alertes")
+@timed('stats_slash')
+async def stats_slash(interaction: discord.Interaction):
+    """Slash command pour les statistiques des alertes"""
+    # The history may still be opening (up to 5s): acknowledge within Discord's 3s window first
+    await interaction.response.defer(ephemeral=True)
+    # Read from the SQLite aggregates off the event loop
+    stats = await asyncio.to_thread(alert_history.stats, Config.STATS_DAYS)
+    if stats is None:
+        await interaction.followup.send("❌ L'historique des alertes est indisponible.", ephemeral=True)
+        return
+    
     embed = discord.Embed(
-        title="🚨 Alerte Percepteur🚨",
-        description="😎 Ce Bot codé par Viti vous permet de ping rapidement les niveaux 200 en cas d'attaque ! 😎",
+        title="📊 Statistiques des alertes",
+        description=f"{stats['total']} alerte(s) sur {stats['days']} jour(s) "
+                    f"({stats['average_per_day']} par jour en moyenne)",
         color=discord.Color.orange()
     )
     
-    view = MessageButtonView()
-    await interaction.response.send_message(embed=embed, view=view)
+    per_day = "\n".join(f"`{row['day']}` - {row['alerts']}" for row in stats['per_day'][-7:])
+    embed.add_field(name="Alertes par jour", value=per_day or "Aucune alerte", inline=False)
+    
+    top = "\n".join(
+        f"{rank}. <@{row['reporter_id']}> - {row['alerts']}"
+        for rank, row in enumerate(stats['top_reporters'], start=1)
+    )
+    embed.add_field(name="Meilleurs signaleurs", value=top or "Aucun signaleur", inline=False)
+    
+    median = stats['median_latency_ms']
+    embed.add_field(
+        name="Temps de réponse médian",
+        value=f"{median / 1000:.2f}s" if median is not None else "N/A",
+        inline=False
+    )
+    await interaction.followup.send(embed=embed, ephemeral=True)
 
 @bot.event
 async def on_interaction(interaction: discord.Interaction):
     """Log all interactions for debugging"""
     if interaction.type == discord.InteractionType.component:
         logger.info(f"Button interaction from {interaction.user}: {interaction.data}")
+    if not bot.first_interaction_logged:
+        bot.first_interaction_logged = True
+        session = 'resumed session' if bot.session_resumed else 'new session'
+        logger.info(f"Startup to first interaction: {time.perf_counter() - bot.start_time:.2f}s ({session})")
 
 
 # Main function to run the bot
@@ -177,26 +446,49 @@ async def main():
         logger.error("DISCORD_TOKEN not found in environment variables!")
         return
     
+    # Same checks as a hot reload; the bot still starts so the errors can be fixed live
+    for error in Config.validate_config():
+        logger.error(f"Configuration error: {error}")
+    
+    web_runner = None
+    # Measure event-loop lag and capture the stack of blocking code
+    watchdog.start()
     try:
-        # Start web server for UptimeRobot
-        start_web_server()
-        
-        # Start keep alive task
-        asyncio.create_task(keep_alive_task())
+        # Start web server for UptimeRobot (the web stack isn't even imported without a port)
+        if Config.WEB_SERVER_PORT:
+            with startup_profile.phase('web server'):
+                web_runner = await start_probe_server()
+        else:
+            logger.info("WEB_SERVER_PORT is 0, web server disabled")
         
         # Start the bot
+        bot.start_time = time.perf_counter()
         await bot.start(token)
     except discord.LoginFailure:
         logger.error("Invalid Discord token!")
     except Exception as e:
         logger.error(f"Error starting bot: {e}")
+    finally:
+        watchdog.stop()
+        if web_runner is not None:
+            from keep_alive import stop_async_web_server
+            await stop_async_web_server(web_runner)
+
+async def start_probe_server():
+    """Import and start the configured web backend; returns the aiohttp runner, if any"""
+    import keep_alive
+    if Config.WEB_SERVER_BACKEND == 'aiohttp':
+        return await keep_alive.start_async_web_server()
+    keep_alive.start_web_server()
+    return None
+
+def log_alert_summary():
+    """Periodic summary of alert delivery timings and coalescing"""
+    timings = alert_pipeline.timings.summary()
+    if timings:
+        logger.info(f"Alert timings: {timings} coalescing: {alert_pipeline.coalescer.stats()}")
 
-# Rename the existing keep_alive function to avoid conflict
-async def keep_alive_task():
-    """Keep the bot alive on hosting services"""
-    while True:
-        await asyncio.sleep(300)  # 5 minutes
-        logger.info("Keep alive ping")
+watchdog.reporters.extend([probe_stats.log_summary, log_alert_summary])
 
 if __name__ == "__main__":
     # Run the bot
@@ -0,0 +1,45 @@
+from typing import Any, Dict
+import discord
+from config import Config
+
+# Profils de cache disponibles (CACHE_PROFILE)
+PROFILES = ('default', 'lean')
+
+
+def build_intents(profile: str, slash_only: bool) -> discord.Intents:
+    """
+    Intents demandés au gateway
+
+    Le profil 'lean' ne garde que ce que le bot utilise : les serveurs (channels
+    et rôles, pour les vérifications de permission et les destinations
+    d'alerte) et, sauf en mode slash uniquement, les messages pour les
+    commandes préfixe.
+    """
+    if profile == 'lean':
+        intents = discord.Intents.none()
+        intents.guilds = True
+        intents.guild_messages = intents.dm_messages = not slash_only
+    else:
+        intents = discord.Intents.default()
+    intents.message_content = not slash_only
+    return intents
+
+
+def client_options(config=Config) -> Dict[str, Any]:
+    """
+    Intents et options de cache passés à commands.Bot selon CACHE_PROFILE
+
+    En 'lean' : pas de cache de messages (le bot ne relit jamais un message
+    reçu), aucun membre en cache hormis le bot lui-même (les membres qui
+    interagissent arrivent complets avec l'interaction) et pas de chunking
+    au démarrage.
+    """
+    intents = build_intents(config.CACHE_PROFILE, config.SLASH_ONLY)
+    if config.CACHE_PROFILE != 'lean':
+        return {'intents': intents}
+    return {
+        'intents': intents,
+        'max_messages': None,
+        'member_cache_flags': discord.MemberCacheFlags.none(),
+        'chunk_guilds_at_startup': False,
+    }
@@ -0,0 +1,100 @@
+import logging
+from typing import Dict, Iterable, Optional
+import discord
+
+logger = logging.getLogger('discord_bot')
+
+
+class ChannelEntry:
+    """Channel cible résolu, avec ses vérifications pré-calculées"""
+
+    __slots__ = ('channel', 'is_text', 'can_send')
+
+    def __init__(self, channel: discord.abc.GuildChannel):
+        self.channel = channel
+        self.is_text = isinstance(channel, discord.TextChannel)
+        self.can_send = self._can_send(channel)
+
+    @staticmethod
+    def _can_send(channel: discord.abc.GuildChannel) -> bool:
+        me = channel.guild.me if channel.guild else None
+        if me is None:
+            # Membre du bot pas en cache : on laisse Discord trancher à l'envoi
+            return True
+        return channel.permissions_for(me).send_messages
+
+
+class ChannelRegistry:
+    """
+    Registre des channels de destination des boutons
+
+    Les channels configurés sont résolus une fois dans on_ready (avec repli
+    sur fetch_channel s'ils ne sont pas en cache), et le type et les
+    permissions du bot sont pré-calculés. Les événements de channel, de rôle
+    et de membre du bot rafraîchissent les entrées concernées, si bien que
+    le chemin d'une alerte ne fait ni recherche ni calcul de permissions.
+    """
+
+    def __init__(self):
+        self._entries: Dict[int, ChannelEntry] = {}
+
+    def get(self, channel_id: int) -> Optional[ChannelEntry]:
+        return self._entries.get(channel_id)
+
+    async def resolve(self, client: discord.Client, channel_id: int) -> Optional[ChannelEntry]:
+        """
+        Résout un channel depuis le cache ou l'API et l'enregistre
+
+        Returns:
+            Optional[ChannelEntry]: None si le channel est introuvable ou inaccessible
+        """
+        channel = client.get_channel(channel_id)
+        if channel is None:
+            try:
+                channel = await client.fetch_channel(channel_id)
+            except (discord.NotFound, discord.Forbidden) as e:
+                logger.error(f"Channel {channel_id} cannot be fetched: {e}")
+                return None
+            except (discord.HTTPException, discord.RateLimited) as e:
+                # RateLimited (429 plus long que REST_MAX_RATELIMIT_WAIT) n'est pas une HTTPException
+                logger.error(f"HTTP error fetching channel {channel_id}: {e}")
+                return None
+        if not isinstance(channel, discord.abc.GuildChannel):
+            logger.error(f"Channel {channel_id} is not a guild channel")
+            return None
+
+        entry = ChannelEntry(channel)
+        self._entries[channel_id] = entry
+        return entry
+
+    async def resolve_all(self, client: discord.Client, channel_ids: Iterable[int]):
+        """Résout tous les channels configurés (appelé dans on_ready)"""
+        for channel_id in set(channel_ids):
+            if not channel_id:
+                continue
+            entry = await self.resolve(client, channel_id)
+            if entry is None:
+                continue
+            if not entry.is_text:
+                logger.warning(f"Configured channel {channel_id} is not a text channel")
+            elif not entry.can_send:
+                logger.warning(f"Bot cannot send messages in configured channel #{entry.channel.name} ({channel_id})")
+        logger.info(f"Channel registry ready: {len(self._entries)} channel(s) resolved")
+
+    def refresh_channel(self, channel: discord.abc.GuildChannel):
+        """Met à jour l'entrée d'un channel modifié (nom, type, permissions)"""
+        if channel.id in self._entries:
+            self._entries[channel.id] = ChannelEntry(channel)
+
+    def refresh_guild(self, guild: discord.Guild):
+        """Recalcule les permissions de tous les channels d'un serveur"""
+        for channel_id, entry in list(self._entries.items()):
+            if entry.channel.guild.id == guild.id:
+                self._entries[channel_id] = ChannelEntry(guild.get_channel(channel_id) or entry.channel)
+
+    def remove(self, channel_id: int):
+        self._entries.pop(channel_id, None)
+
+
+# Registre partagé par les vues et les événements du bot
+channel_registry = ChannelRegistry()
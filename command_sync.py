@@ -0,0 +1,70 @@
+import hashlib
+import json
+import logging
+from typing import Optional
+import discord
+from discord import app_commands
+from rest_scheduler import Priority, rest_scheduler
+
+logger = logging.getLogger('discord_bot')
+
+
+def command_tree_fingerprint(tree: app_commands.CommandTree) -> str:
+    """
+    Calcule une empreinte stable des commandes enregistrées
+
+    L'empreinte couvre le payload envoyé à Discord par tree.sync() (noms,
+    descriptions, options, permissions...) pour tous les types de commandes,
+    triés pour ne pas dépendre de l'ordre d'enregistrement.
+    """
+    payload = []
+    for command_type in (discord.AppCommandType.chat_input, discord.AppCommandType.user, discord.AppCommandType.message):
+        for command in tree.get_commands(type=command_type):
+            payload.append(command.to_dict(tree))
+    payload.sort(key=lambda data: (data.get('type', 1), data['name']))
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _read_state(path: str) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_state(path: str, application_id: Optional[int], fingerprint: str):
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'application_id': application_id, 'fingerprint': fingerprint}, f)
+    except OSError as e:
+        logger.warning(f"Could not store command fingerprint in {path}: {e}")
+
+
+async def sync_if_changed(tree: app_commands.CommandTree, application_id: Optional[int],
+                          state_file: str, force: bool = False) -> bool:
+    """
+    Synchronise les commandes slash uniquement si elles ont changé
+
+    Args:
+        tree: L'arbre de commandes du bot
+        application_id: L'ID de l'application (l'empreinte est liée au bot)
+        state_file: Fichier où est stockée la dernière empreinte synchronisée
+        force: Synchroniser même si l'empreinte est identique
+
+    Returns:
+        bool: True si une synchronisation a été effectuée
+    """
+    fingerprint = command_tree_fingerprint(tree)
+    state = _read_state(state_file)
+    unchanged = state.get('fingerprint') == fingerprint and state.get('application_id') == application_id
+
+    if unchanged and not force:
+        logger.info(f"Command tree unchanged ({fingerprint[:12]}), skipping sync")
+        return False
+
+    synced = await rest_scheduler.run(Priority.COSMETIC, 'commands', tree.sync)
+    logger.info(f"Synced {len(synced)} command(s)")
+    _write_state(state_file, application_id, fingerprint)
+    return True
@@ -1,36 +1,160 @@
 import os
-from typing import List, Optional
+from types import MappingProxyType
+from typing import Any, FrozenSet, List, Mapping, Tuple
+from dotenv import dotenv_values
 
-class Config:
-    """Configuration du bot Discord"""
-    
-    # Token du bot Discord
-    DISCORD_TOKEN: str = os.getenv('DISCORD_TOKEN', '')
+def _env_bool(env: Mapping[str, str], name: str, default: str) -> bool:
+    """Lit une variable d'environnement booléenne (1/true/yes/on)"""
+    return env.get(name, default).strip().lower() in ('1', 'true', 'yes', 'on')
+
+def _parse_role_ids(value: str) -> FrozenSet[int]:
+    """
+    Lit une liste d'IDs de rôles séparés par des virgules
+
+    Raises:
+        ValueError: Si un des IDs n'est pas numérique
+    """
+    return frozenset(int(role_id.strip()) for role_id in value.split(',') if role_id.strip())
+
+class ConfigSnapshot:
+    """
+    Configuration du bot Discord, figée
     
-    # Préfixe des commandes
-    COMMAND_PREFIX: str = os.getenv('COMMAND_PREFIX', '!')
+    Un snapshot est lu une fois depuis un environnement et n'est plus jamais
+    modifié : un rechargement construit un nouveau snapshot, le valide, puis
+    remplace la référence lue par `Config` (voir config_reload.py).
+    """
     
-    # IDs des channels pour les boutons
-    ANNOUNCEMENT_CHANNEL_ID: int = int(os.getenv('ANNOUNCEMENT_CHANNEL_ID', '1340822272956567572'))
-    GENERAL_CHANNEL_ID: int = int(os.getenv('GENERAL_CHANNEL_ID', '1340822272956567572'))
-    EVENT_CHANNEL_ID: int = int(os.getenv('EVENT_CHANNEL_ID', '1340822272956567572'))
-    ALERT_CHANNEL_ID: int = int(os.getenv('ALERT_CHANNEL_ID', '1408473953277841570'))
+    def __init__(self, env: Mapping[str, str]):
+        get = env.get
+        # Token du bot Discord
+        self.DISCORD_TOKEN: str = get('DISCORD_TOKEN', '')
+        
+        # Préfixe des commandes
+        self.COMMAND_PREFIX: str = get('COMMAND_PREFIX', '!')
+        
+        # IDs des channels pour les boutons
+        self.ANNOUNCEMENT_CHANNEL_ID: int = int(get('ANNOUNCEMENT_CHANNEL_ID', '1340822272956567572'))
+        self.GENERAL_CHANNEL_ID: int = int(get('GENERAL_CHANNEL_ID', '1340822272956567572'))
+        self.EVENT_CHANNEL_ID: int = int(get('EVENT_CHANNEL_ID', '1340822272956567572'))
+        self.ALERT_CHANNEL_ID: int = int(get('ALERT_CHANNEL_ID', '1408473953277841570'))
+        
+        # IDs des rôles autorisés à utiliser les boutons (optionnel)
+        self.ALLOWED_ROLE_IDS: FrozenSet[int] = frozenset()
+        self._role_ids_valid = True
+        try:
+            self.ALLOWED_ROLE_IDS = _parse_role_ids(get('ALLOWED_ROLE_IDS', ''))
+        except ValueError:
+            self._role_ids_valid = False
+        # Durée (secondes) de mise en cache des décisions de permission par membre
+        self.PERMISSION_CACHE_TTL: int = int(get('PERMISSION_CACHE_TTL', '300'))
+        
+        # Synchronisation des commandes slash : seulement si l'arbre de commandes a changé
+        self.COMMAND_SYNC_STATE_FILE: str = get('COMMAND_SYNC_STATE_FILE', '.command_sync.json')
+        self.FORCE_COMMAND_SYNC: bool = _env_bool(env, 'FORCE_COMMAND_SYNC', 'false')
+        
+        # Alertes : acquittement immédiat puis livraison en arrière-plan
+        self.ALERT_DEFER_MODE: bool = _env_bool(env, 'ALERT_DEFER_MODE', 'true')
+        self.ALERT_WORKERS: int = int(get('ALERT_WORKERS', '2'))
+        # Fenêtre (secondes) pendant laquelle les nouvelles alertes d'un channel modifient
+        # le message existant au lieu d'en poster un nouveau (0 = désactivé)
+        self.ALERT_COALESCE_SECONDS: float = float(get('ALERT_COALESCE_SECONDS', '60'))
+        # Destinations de l'alerte : IDs de channels et/ou URLs de webhooks séparés par
+        # des virgules (par défaut ALERT_CHANNEL_ID seul)
+        self.ALERT_TARGETS: Tuple[str, ...] = tuple(t.strip() for t in get('ALERT_TARGETS', '').split(',') if t.strip()) or (str(self.ALERT_CHANNEL_ID),)
+        # Envois simultanés par alerte et délai max (secondes) pour que l'envoi vers une
+        # destination démarre (un envoi commencé n'est jamais abandonné)
+        self.ALERT_FANOUT_CONCURRENCY: int = int(get('ALERT_FANOUT_CONCURRENCY', '4'))
+        self.ALERT_TARGET_TIMEOUT: float = float(get('ALERT_TARGET_TIMEOUT', '10'))
+        # Historique des alertes (SQLite, vide = désactivé) et période couverte par /stats (jours)
+        self.ALERT_HISTORY_DB: str = get('ALERT_HISTORY_DB', 'alert_history.db')
+        self.STATS_DAYS: int = int(get('STATS_DAYS', '7'))
+        
+        # Limites du bouton d'alerte (token buckets) : capacité = appuis en rafale,
+        # recharge = secondes pour regagner un appui (capacité 0 = pas de limite)
+        self.ALERT_USER_BUCKET_CAPACITY: int = int(get('ALERT_USER_BUCKET_CAPACITY', '3'))
+        self.ALERT_USER_BUCKET_REFILL_SECONDS: float = float(get('ALERT_USER_BUCKET_REFILL_SECONDS', '20'))
+        self.ALERT_GUILD_BUCKET_CAPACITY: int = int(get('ALERT_GUILD_BUCKET_CAPACITY', '15'))
+        self.ALERT_GUILD_BUCKET_REFILL_SECONDS: float = float(get('ALERT_GUILD_BUCKET_REFILL_SECONDS', '4'))
+        self.ALERT_CHANNEL_BUCKET_CAPACITY: int = int(get('ALERT_CHANNEL_BUCKET_CAPACITY', '20'))
+        self.ALERT_CHANNEL_BUCKET_REFILL_SECONDS: float = float(get('ALERT_CHANNEL_BUCKET_REFILL_SECONDS', '3'))
+        
+        # Ordonnanceur des envois REST : envois simultanés, taille de la file, et attente
+        # max d'un 429 gérée par discord.py avant de rendre la main (minimum 30s). Ce plafond
+        # vaut pour tout le client : au-delà, un appel REST lève discord.RateLimited, qui
+        # n'est pas une HTTPException et doit être intercepté à part hors de l'ordonnanceur
+        self.REST_CONCURRENCY: int = int(get('REST_CONCURRENCY', '4'))
+        self.REST_QUEUE_SIZE: int = int(get('REST_QUEUE_SIZE', '100'))
+        self.REST_MAX_RATELIMIT_WAIT: float = float(get('REST_MAX_RATELIMIT_WAIT', '30'))
+        
+        # Serveur web keep-alive ('flask' = thread séparé, 'aiohttp' = boucle asyncio du bot,
+        # port 0 = désactivé)
+        self.WEB_SERVER_BACKEND: str = get('WEB_SERVER_BACKEND', 'flask').lower()
+        self.WEB_SERVER_PORT: int = int(get('WEB_SERVER_PORT', '5000'))
+        
+        # Journalise la durée de chaque phase du démarrage au premier ready
+        self.STARTUP_PROFILE: bool = _env_bool(env, 'STARTUP_PROFILE', 'false')
+        # Santé : intervalle de publication de l'état du bot et délai au-delà duquel
+        # la gateway est considérée inactive (/healthz renvoie alors 503)
+        self.HEALTH_PUBLISH_SECONDS: float = float(get('HEALTH_PUBLISH_SECONDS', '5'))
+        self.HEALTH_STALE_SECONDS: float = float(get('HEALTH_STALE_SECONDS', '90'))
+        # Watchdog de la boucle asyncio : période de mesure du lag et seuil de blocage
+        # au-delà duquel la pile du code bloquant est capturée (secondes)
+        self.WATCHDOG_INTERVAL: float = float(get('WATCHDOG_INTERVAL', '0.1'))
+        self.WATCHDOG_STALL_SECONDS: float = float(get('WATCHDOG_STALL_SECONDS', '0.5'))
+        # Intervalle (secondes) des résumés périodiques dans les logs (sondes, alertes, lag)
+        self.PROBE_SUMMARY_SECONDS: int = int(get('PROBE_SUMMARY_SECONDS', '300'))
+        
+        # Logs : fichier, rotation (taille en octets et/ou âge en secondes, 0 = désactivé)
+        self.LOG_FILE: str = get('LOG_FILE', 'bot.log')
+        self.LOG_MAX_BYTES: int = int(get('LOG_MAX_BYTES', str(5 * 1024 * 1024)))
+        self.LOG_ROTATE_SECONDS: int = int(get('LOG_ROTATE_SECONDS', '0'))
+        self.LOG_BACKUP_COUNT: int = int(get('LOG_BACKUP_COUNT', '5'))
+        
+        # Niveaux de logs (global et par logger)
+        self.LOG_LEVEL: str = get('LOG_LEVEL', 'INFO')
+        self.LOGGER_LEVELS: Mapping[str, str] = MappingProxyType({
+            'discord_bot': get('LOG_LEVEL_DISCORD_BOT', 'INFO'),
+            'keep_alive': get('LOG_LEVEL_KEEP_ALIVE', 'INFO'),
+            'werkzeug': get('LOG_LEVEL_WERKZEUG', 'WARNING'),
+        })
+        
+        # Rechargement à chaud : fichier surveillé (date de modification) et période de
+        # vérification en secondes (0 = désactivé)
+        self.CONFIG_FILE: str = get('CONFIG_FILE', '.env')
+        self.CONFIG_RELOAD_SECONDS: float = float(get('CONFIG_RELOAD_SECONDS', '5'))
+        
+        # Profil de cache et d'intents ('default' ou 'lean') ; SLASH_ONLY retire l'intent
+        # message_content (commandes préfixe désactivées)
+        self.CACHE_PROFILE: str = get('CACHE_PROFILE', 'default').lower()
+        self.SLASH_ONLY: bool = _env_bool(env, 'SLASH_ONLY', 'false')
+        
+        # Redémarrage rapide : session gateway enregistrée (fichier, période d'écriture en
+        # secondes) et reprise (RESUME) au démarrage si elle a moins de GATEWAY_SESSION_MAX_AGE secondes
+        self.GATEWAY_RESUME: bool = _env_bool(env, 'GATEWAY_RESUME', 'false')
+        self.GATEWAY_SESSION_FILE: str = get('GATEWAY_SESSION_FILE', '.gateway_session.json')
+        self.GATEWAY_SESSION_SAVE_SECONDS: float = float(get('GATEWAY_SESSION_SAVE_SECONDS', '5'))
+        self.GATEWAY_SESSION_MAX_AGE: float = float(get('GATEWAY_SESSION_MAX_AGE', '120'))
+        
+        self._frozen = True
     
-    # IDs des rôles autorisés à utiliser les boutons (optionnel)
-    ALLOWED_ROLE_IDS: List[int] = []
+    def __setattr__(self, name: str, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError(f"La configuration est immuable ({name})")
+        object.__setattr__(self, name, value)
     
-    @classmethod
-    def load_allowed_roles(cls):
-        """Charge les IDs des rôles autorisés depuis les variables d'environnement"""
-        roles_str = os.getenv('ALLOWED_ROLE_IDS', '')
-        if roles_str:
-            try:
-                cls.ALLOWED_ROLE_IDS = [int(role_id.strip()) for role_id in roles_str.split(',') if role_id.strip()]
-            except ValueError:
-                print("Erreur: ALLOWED_ROLE_IDS doit contenir des IDs numériques séparés par des virgules")
+    def target_channel_ids(self) -> List[int]:
+        """Retourne les IDs des channels de destination configurés"""
+        channel_ids = [
+            self.ALERT_CHANNEL_ID,
+            self.ANNOUNCEMENT_CHANNEL_ID,
+            self.GENERAL_CHANNEL_ID,
+            self.EVENT_CHANNEL_ID
+        ]
+        channel_ids += [int(target) for target in self.ALERT_TARGETS if target.isdigit()]
+        return list(dict.fromkeys(channel_ids))
     
-    @classmethod
-    def validate_config(cls) -> List[str]:
+    def validate_config(self) -> List[str]:
         """
         Valide la configuration et retourne une liste d'erreurs
         
@@ -39,36 +163,74 @@ class Config:
         """
         errors = []
         
-        if not cls.DISCORD_TOKEN:
+        if not self._role_ids_valid:
+            errors.append("ALLOWED_ROLE_IDS doit contenir des IDs numériques séparés par des virgules")
+        
+        if not self.DISCORD_TOKEN:
             errors.append("DISCORD_TOKEN est requis")
         
-        if cls.ANNOUNCEMENT_CHANNEL_ID == 0:
+        if self.ANNOUNCEMENT_CHANNEL_ID == 0:
             errors.append("ANNOUNCEMENT_CHANNEL_ID doit être configuré")
         
-        if cls.GENERAL_CHANNEL_ID == 0:
+        if self.GENERAL_CHANNEL_ID == 0:
             errors.append("GENERAL_CHANNEL_ID doit être configuré")
         
-        if cls.EVENT_CHANNEL_ID == 0:
+        if self.EVENT_CHANNEL_ID == 0:
             errors.append("EVENT_CHANNEL_ID doit être configuré")
         
-        if cls.ALERT_CHANNEL_ID == 0:
+        if self.ALERT_CHANNEL_ID == 0:
             errors.append("ALERT_CHANNEL_ID doit être configuré")
         
+        # Import tardif : alert_targets importe discord.py
+        from alert_targets import parse_target
+        for target in self.ALERT_TARGETS:
+            try:
+                parse_target(target)
+            except ValueError:
+                errors.append(f"ALERT_TARGETS: destination invalide '{target[:40]}' (ID de channel ou URL de webhook https)")
+        
+        for scope in ('USER', 'GUILD', 'CHANNEL'):
+            capacity = getattr(self, f'ALERT_{scope}_BUCKET_CAPACITY')
+            refill = getattr(self, f'ALERT_{scope}_BUCKET_REFILL_SECONDS')
+            if capacity < 0:
+                errors.append(f"ALERT_{scope}_BUCKET_CAPACITY doit être positif (0 = pas de limite)")
+            elif capacity > 0 and refill <= 0:
+                errors.append(f"ALERT_{scope}_BUCKET_REFILL_SECONDS doit être strictement positif")
+        
+        if self.STATS_DAYS < 1:
+            errors.append("STATS_DAYS doit être au moins 1")
+        
+        if self.CONFIG_RELOAD_SECONDS < 0:
+            errors.append("CONFIG_RELOAD_SECONDS doit être positif (0 = désactivé)")
+        
+        if self.GATEWAY_SESSION_SAVE_SECONDS < 0:
+            errors.append("GATEWAY_SESSION_SAVE_SECONDS doit être positif (0 = seulement à l'arrêt)")
+        
+        if self.CACHE_PROFILE not in ('default', 'lean'):
+            errors.append("CACHE_PROFILE doit valoir 'default' ou 'lean'")
+        
+        if self.WEB_SERVER_BACKEND not in ('flask', 'aiohttp'):
+            errors.append("WEB_SERVER_BACKEND doit valoir 'flask' ou 'aiohttp'")
+        
+        if self.WEB_SERVER_PORT < 0:
+            errors.append("WEB_SERVER_PORT doit être positif (0 = serveur web désactivé)")
+        
         return errors
     
-    @classmethod
-    def print_config_status(cls):
+    def print_config_status(self):
         """Affiche le statut de la configuration"""
         print("=== Configuration du Bot Discord ===")
-        print(f"Token configuré: {'✅' if cls.DISCORD_TOKEN else '❌'}")
-        print(f"Préfixe: {cls.COMMAND_PREFIX}")
-        print(f"Channel Annonces: {cls.ANNOUNCEMENT_CHANNEL_ID if cls.ANNOUNCEMENT_CHANNEL_ID != 0 else '❌ Non configuré'}")
-        print(f"Channel Général: {cls.GENERAL_CHANNEL_ID if cls.GENERAL_CHANNEL_ID != 0 else '❌ Non configuré'}")
-        print(f"Channel Événements: {cls.EVENT_CHANNEL_ID if cls.EVENT_CHANNEL_ID != 0 else '❌ Non configuré'}")
-        print(f"Channel Alertes: {cls.ALERT_CHANNEL_ID if cls.ALERT_CHANNEL_ID != 0 else '❌ Non configuré'}")
-        print(f"Rôles autorisés: {len(cls.ALLOWED_ROLE_IDS)} rôle(s)")
-        
-        errors = cls.validate_config()
+        print(f"Token configuré: {'✅' if self.DISCORD_TOKEN else '❌'}")
+        print(f"Préfixe: {self.COMMAND_PREFIX}")
+        print(f"Channel Annonces: {self.ANNOUNCEMENT_CHANNEL_ID if self.ANNOUNCEMENT_CHANNEL_ID != 0 else '❌ Non configuré'}")
+        print(f"Channel Général: {self.GENERAL_CHANNEL_ID if self.GENERAL_CHANNEL_ID != 0 else '❌ Non configuré'}")
+        print(f"Channel Événements: {self.EVENT_CHANNEL_ID if self.EVENT_CHANNEL_ID != 0 else '❌ Non configuré'}")
+        print(f"Channel Alertes: {self.ALERT_CHANNEL_ID if self.ALERT_CHANNEL_ID != 0 else '❌ Non configuré'}")
+        print(f"Destinations d'alerte: {len(self.ALERT_TARGETS)}")
+        print(f"Rôles autorisés: {len(self.ALLOWED_ROLE_IDS)} rôle(s)")
+        print(f"Serveur web: {f'{self.WEB_SERVER_BACKEND} (port {self.WEB_SERVER_PORT})' if self.WEB_SERVER_PORT else 'désactivé'}")
+        
+        errors = self.validate_config()
         if errors:
             print("\n❌ Erreurs de configuration:")
             for error in errors:
@@ -77,8 +239,85 @@ class Config:
             print("\n✅ Configuration valide!")
         print("=" * 37)
 
-# Charger les rôles autorisés au démarrage
-Config.load_allowed_roles()
+class _ConfigProxy:
+    """
+    Accès à la configuration en vigueur
+
+    `Config.X` lit toujours le snapshot courant ; `swap` le remplace d'un
+    coup (simple affectation de référence), les lecteurs voient donc soit
+    l'ancien snapshot complet, soit le nouveau.
+    """
+    
+    __slots__ = ('_snapshot',)
+    
+    def __init__(self, snapshot: ConfigSnapshot):
+        object.__setattr__(self, '_snapshot', snapshot)
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._snapshot, name)
+    
+    def __setattr__(self, name: str, value):
+        raise AttributeError("La configuration est immuable : utilisez Config.swap()")
+    
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        return self._snapshot
+    
+    def swap(self, snapshot: ConfigSnapshot) -> ConfigSnapshot:
+        """Installe un nouveau snapshot et retourne l'ancien"""
+        previous = self._snapshot
+        object.__setattr__(self, '_snapshot', snapshot)
+        return previous
+
+# Environnement du processus au chargement ; au rechargement, il garde la priorité
+# sur le fichier surveillé (comme load_dotenv, qui n'écrase pas les variables existantes)
+BASE_ENV: Mapping[str, str] = MappingProxyType(dict(os.environ))
+
+def load_snapshot(path: str) -> ConfigSnapshot:
+    """
+    Construit un snapshot depuis le fichier `path` (s'il existe) complété par BASE_ENV
+
+    Raises:
+        ValueError: Si une valeur numérique est invalide
+    """
+    env = {key: value for key, value in dotenv_values(path).items() if value is not None}
+    env.update(BASE_ENV)
+    return ConfigSnapshot(env)
+
+# Configuration courante, lue comme au rechargement : l'import de config précède
+# le load_dotenv() de bot.py, le fichier doit donc être lu ici
+Config = _ConfigProxy(load_snapshot(BASE_ENV.get('CONFIG_FILE', '.env')))
+
+# Paramètres lus une seule fois au démarrage : les modifier demande un redémarrage
+RESTART_REQUIRED = (
+    'DISCORD_TOKEN',
+    'COMMAND_SYNC_STATE_FILE',
+    'FORCE_COMMAND_SYNC',
+    'ALERT_WORKERS',
+    'ALERT_HISTORY_DB',
+    'REST_CONCURRENCY',
+    'REST_QUEUE_SIZE',
+    'REST_MAX_RATELIMIT_WAIT',
+    'WEB_SERVER_BACKEND',
+    'WEB_SERVER_PORT',
+    'HEALTH_PUBLISH_SECONDS',
+    'WATCHDOG_INTERVAL',
+    'WATCHDOG_STALL_SECONDS',
+    'PROBE_SUMMARY_SECONDS',
+    'LOG_FILE',
+    'LOG_MAX_BYTES',
+    'LOG_ROTATE_SECONDS',
+    'LOG_BACKUP_COUNT',
+    'CONFIG_FILE',
+    'CONFIG_RELOAD_SECONDS',
+    'GATEWAY_RESUME',
+    'GATEWAY_SESSION_FILE',
+    'GATEWAY_SESSION_SAVE_SECONDS',
+    'GATEWAY_SESSION_MAX_AGE',
+    'CACHE_PROFILE',
+    'SLASH_ONLY',
+    'STARTUP_PROFILE'
+)
 
 # Variables d'environnement requises
 REQUIRED_ENV_VARS = [
@@ -92,5 +331,49 @@ REQUIRED_ENV_VARS = [
 # Variables d'environnement optionnelles
 OPTIONAL_ENV_VARS = [
     'COMMAND_PREFIX',
-    'ALLOWED_ROLE_IDS'
+    'COMMAND_SYNC_STATE_FILE',
+    'FORCE_COMMAND_SYNC',
+    'ALLOWED_ROLE_IDS',
+    'PERMISSION_CACHE_TTL',
+    'ALERT_DEFER_MODE',
+    'ALERT_WORKERS',
+    'ALERT_COALESCE_SECONDS',
+    'ALERT_TARGETS',
+    'ALERT_FANOUT_CONCURRENCY',
+    'ALERT_TARGET_TIMEOUT',
+    'ALERT_HISTORY_DB',
+    'STATS_DAYS',
+    'ALERT_USER_BUCKET_CAPACITY',
+    'ALERT_USER_BUCKET_REFILL_SECONDS',
+    'ALERT_GUILD_BUCKET_CAPACITY',
+    'ALERT_GUILD_BUCKET_REFILL_SECONDS',
+    'ALERT_CHANNEL_BUCKET_CAPACITY',
+    'ALERT_CHANNEL_BUCKET_REFILL_SECONDS',
+    'REST_CONCURRENCY',
+    'REST_QUEUE_SIZE',
+    'REST_MAX_RATELIMIT_WAIT',
+    'WEB_SERVER_BACKEND',
+    'WEB_SERVER_PORT',
+    'HEALTH_PUBLISH_SECONDS',
+    'HEALTH_STALE_SECONDS',
+    'WATCHDOG_INTERVAL',
+    'WATCHDOG_STALL_SECONDS',
+    'PROBE_SUMMARY_SECONDS',
+    'LOG_FILE',
+    'LOG_MAX_BYTES',
+    'LOG_ROTATE_SECONDS',
+    'LOG_BACKUP_COUNT',
+    'LOG_LEVEL',
+    'LOG_LEVEL_DISCORD_BOT',
+    'LOG_LEVEL_KEEP_ALIVE',
+    'LOG_LEVEL_WERKZEUG',
+    'CONFIG_FILE',
+    'CONFIG_RELOAD_SECONDS',
+    'GATEWAY_RESUME',
+    'GATEWAY_SESSION_FILE',
+    'GATEWAY_SESSION_SAVE_SECONDS',
+    'GATEWAY_SESSION_MAX_AGE',
+    'CACHE_PROFILE',
+    'SLASH_ONLY',
+    'STARTUP_PROFILE'
 ]
@@ -0,0 +1,127 @@
+import asyncio
+import inspect
+import logging
+import os
+from typing import Awaitable, Callable, List, Optional, Tuple, Union
+from config import RESTART_REQUIRED, Config, ConfigSnapshot, load_snapshot
+
+logger = logging.getLogger('discord_bot')
+
+# Appelé après chaque remplacement de la configuration avec (ancien, nouveau) snapshot
+ConfigListener = Callable[[ConfigSnapshot, ConfigSnapshot], Union[None, Awaitable[None]]]
+
+
+def changed_settings(old: ConfigSnapshot, new: ConfigSnapshot) -> List[str]:
+    """Noms des paramètres dont la valeur diffère entre deux snapshots"""
+    return [
+        name for name, value in vars(new).items()
+        if not name.startswith('_') and getattr(old, name, None) != value
+    ]
+
+
+class ConfigWatcher:
+    """
+    Rechargement à chaud de la configuration
+
+    Vérifie toutes les `interval` secondes la date de modification (et la
+    taille) du fichier surveillé, un simple stat. S'il a changé, un nouveau
+    snapshot est construit depuis l'environnement du processus complété par
+    le fichier, puis validé par validate_config : une modification invalide
+    est rejetée et l'ancienne configuration reste en vigueur. Sinon le
+    snapshot est installé d'un coup et les `listeners` sont prévenus pour
+    mettre à jour les caches (permissions, channels, limites...).
+    """
+
+    def __init__(self, path: str, interval: float = 5):
+        self.path = path
+        self.interval = interval
+        self.listeners: List[ConfigListener] = []
+        self.reloads = 0
+        self.rejected = 0
+        self._signature: Optional[Tuple[int, int]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def start(self):
+        """Mémorise l'état actuel du fichier puis démarre la surveillance"""
+        if self._task is not None or not self.interval:
+            return
+        self._signature = self._stat()
+        self._task = asyncio.create_task(self._run(), name='config-watcher')
+        logger.info(f"Watching {self.path} for configuration changes every {self.interval:g}s")
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Configuration reload failed: {e}")
+
+    async def check(self) -> bool:
+        """Recharge si le fichier a changé depuis la dernière vérification"""
+        signature = self._stat()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        return await self.reload()
+
+    def load(self) -> ConfigSnapshot:
+        """
+        Construit un snapshot depuis l'environnement du processus et le fichier surveillé
+
+        Raises:
+            ValueError: Si une valeur numérique est invalide
+        """
+        return load_snapshot(self.path)
+
+    async def reload(self) -> bool:
+        """
+        Valide puis installe la configuration du fichier
+
+        Returns:
+            bool: True si une nouvelle configuration a été installée
+        """
+        try:
+            snapshot = self.load()
+        except (OSError, ValueError) as e:
+            self.rejected += 1
+            logger.error(f"Configuration change in {self.path} rejected: {e}")
+            return False
+
+        errors = snapshot.validate_config()
+        if errors:
+            self.rejected += 1
+            logger.error(f"Configuration change in {self.path} rejected: {'; '.join(errors)}")
+            return False
+
+        changed = changed_settings(Config.snapshot, snapshot)
+        if not changed:
+            return False
+
+        previous = Config.swap(snapshot)
+        self.reloads += 1
+        logger.info(f"Configuration reloaded from {self.path}: {', '.join(changed)}")
+        restart = [name for name in changed if name in RESTART_REQUIRED]
+        if restart:
+            logger.warning(f"Restart required to apply: {', '.join(restart)}")
+
+        for listener in self.listeners:
+            try:
+                result = listener(previous, snapshot)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Configuration listener {getattr(listener, '__qualname__', listener)} failed: {e}")
+        return True
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import NamedTuple, Optional
+import discord
+
+logger = logging.getLogger('discord_bot')
+
+
+class SessionState(NamedTuple):
+    """Ce qu'il faut pour reprendre (RESUME) une session gateway"""
+    session_id: str
+    sequence: int
+    resume_url: str
+    saved_at: float         # time.time() de l'enregistrement
+
+
+class GatewaySessionStore:
+    """
+    Sauvegarde de la session gateway entre deux processus
+
+    L'identifiant de session, le dernier numéro de séquence et l'URL de
+    reprise sont écrits toutes les `save_interval` secondes (si la séquence a
+    avancé) et à l'arrêt propre. Au démarrage suivant, `load` retourne la
+    session si elle a moins de `max_age` secondes : le bot tente alors un
+    RESUME, qui évite l'IDENTIFY et le renvoi de l'état complet des serveurs.
+
+    Le fichier est remplacé atomiquement (fichier temporaire + os.replace).
+    """
+
+    def __init__(self, path: str, save_interval: float = 5, max_age: float = 120):
+        self.path = path
+        self.save_interval = save_interval
+        self.max_age = max_age
+        self._saved: Optional[tuple] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def load(self) -> Optional[SessionState]:
+        """Retourne la session enregistrée si elle est encore récente, None sinon"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = SessionState(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        age = time.time() - state.saved_at
+        if age > self.max_age:
+            logger.info(f"Stored gateway session is {age:.0f}s old, identifying instead")
+            return None
+        return state
+
+    def save(self, ws) -> bool:
+        """
+        Enregistre la session du websocket courant
+
+        Returns:
+            bool: True si le fichier a été écrit
+        """
+        session_id = getattr(ws, 'session_id', None)
+        sequence = getattr(ws, 'sequence', None)
+        gateway = getattr(ws, 'gateway', None)
+        if not session_id or sequence is None or gateway is None:
+            return False
+        key = (session_id, sequence)
+        if key == self._saved:
+            return False
+
+        state = SessionState(session_id, sequence, str(gateway), time.time())
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state._asdict(), f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not store gateway session in {self.path}: {e}")
+            return False
+        self._saved = key
+        return True
+
+    def clear(self):
+        """Oublie la session (invalide ou consommée)"""
+        self._saved = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def start(self, client: discord.Client):
+        """Démarre l'enregistrement périodique de la session de `client`"""
+        if self._task is None and self.save_interval > 0:
+            self._task = asyncio.create_task(self._run(client), name='gateway-session-saver')
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, client: discord.Client):
+        while True:
+            await asyncio.sleep(self.save_interval)
+            if client.ws is not None:
+                self.save(client.ws)
+
+
+# Internes (privés) de discord.py nécessaires à la reprise entre deux processus,
+# vérifiés avec discord.py 2.7.1 : à revérifier à chaque mise à jour de la bibliothèque.
+
+def close_resumable(ws: discord.gateway.DiscordWebSocket):
+    """Fait fermer `ws` avec le code 4000 : le code 1000 invaliderait la session côté Discord"""
+    close = ws.close
+
+    async def close_keeping_session(code: int = 4000):
+        await close(code=4000)
+
+    ws.close = close_keeping_session
+
+
+def cache_guild(client: discord.Client, guild: discord.Guild, channels):
+    """Ajoute au cache une guilde et ses channels chargés en REST (ce que ferait un READY)"""
+    for channel in channels:
+        guild._add_channel(channel)
+    client._connection._add_guild(guild)
+
+
+def mark_ready(client: discord.Client):
+    """Termine le démarrage comme un READY : wait_until_ready() rend la main et on_ready est appelé"""
+    client._connection.call_handlers('ready')
+    client.dispatch('ready')
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Callable, NamedTuple, Optional
+import discord
+
+logger = logging.getLogger('discord_bot')
+
+
+class BotSnapshot(NamedTuple):
+    """
+    État du bot à un instant donné
+
+    Objet immuable, publié par la boucle du bot et lu par le serveur web :
+    le côté HTTP ne touche jamais aux objets discord.py.
+    """
+    published_at: float             # time.time() de la publication
+    published_mono: float           # time.monotonic() de la publication
+    ready: bool
+    connected: bool
+    latency_ms: Optional[float]
+    last_heartbeat_ack_age: Optional[float]
+    last_receive_age: Optional[float]
+    guild_count: int
+    uptime: float
+    reconnects: int
+    loop_lag: Optional[dict]
+
+    def to_dict(self, stale_after: float) -> dict:
+        """Sérialise l'instantané en tenant compte de son âge"""
+        age = time.monotonic() - self.published_mono
+        return {
+            "healthy": self.is_healthy(stale_after),
+            "ready": self.ready,
+            "gateway_connected": self.connected,
+            "latency_ms": self.latency_ms,
+            "last_heartbeat_ack_seconds": None if self.last_heartbeat_ack_age is None else round(self.last_heartbeat_ack_age + age, 1),
+            "last_receive_seconds": None if self.last_receive_age is None else round(self.last_receive_age + age, 1),
+            "guild_count": self.guild_count,
+            "uptime_seconds": round(self.uptime + age),
+            "reconnects": self.reconnects,
+            "loop_lag": self.loop_lag,
+            "snapshot_age_seconds": round(age, 1),
+        }
+
+    def is_healthy(self, stale_after: float) -> bool:
+        """
+        Le bot est sain si la gateway est connectée, si Discord a répondu
+        récemment et si la boucle du bot publie encore ses instantanés.
+        """
+        age = time.monotonic() - self.published_mono
+        if age > stale_after or not self.connected:
+            return False
+        if self.last_receive_age is None:
+            return False
+        return self.last_receive_age + age <= stale_after
+
+
+# Dernier instantané publié ; remplacé en bloc (affectation atomique)
+_snapshot: Optional[BotSnapshot] = None
+
+
+def current_snapshot() -> Optional[BotSnapshot]:
+    """Retourne le dernier instantané publié (None avant le premier)"""
+    return _snapshot
+
+
+class HealthPublisher:
+    """
+    Publie périodiquement l'état du bot dans un BotSnapshot
+
+    Tourne sur la boucle du bot : c'est le seul endroit qui lit les objets
+    discord.py. Les événements de connexion publient aussi immédiatement.
+    """
+
+    def __init__(self, client: discord.Client, interval: float,
+                 loop_stats: Optional[Callable[[], dict]] = None):
+        self.client = client
+        self.interval = interval
+        self.loop_stats = loop_stats
+        self.started_mono = time.monotonic()
+        self.connected = False
+        self.reconnects = 0
+        self._has_connected = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name='health-publisher')
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def on_connect(self):
+        if self._has_connected:
+            self.reconnects += 1
+        self._has_connected = True
+        self.connected = True
+        self.publish()
+
+    def on_resumed(self):
+        self.connected = True
+        self.publish()
+
+    def on_disconnect(self):
+        self.connected = False
+        self.publish()
+
+    def publish(self) -> BotSnapshot:
+        """Construit et publie un nouvel instantané"""
+        global _snapshot
+        now_perf = time.perf_counter()
+        latency = self.client.latency
+        keep_alive = getattr(self.client.ws, '_keep_alive', None) if self.client.ws else None
+        last_ack = getattr(keep_alive, '_last_ack', None)
+        last_recv = getattr(keep_alive, '_last_recv', None)
+
+        _snapshot = BotSnapshot(
+            published_at=time.time(),
+            published_mono=time.monotonic(),
+            ready=self.client.is_ready(),
+            connected=self.connected and not self.client.is_closed(),
+            latency_ms=None if math.isnan(latency) or math.isinf(latency) else round(latency * 1000, 1),
+            last_heartbeat_ack_age=None if last_ack is None else now_perf - last_ack,
+            last_receive_age=None if last_recv is None else now_perf - last_recv,
+            guild_count=len(self.client.guilds),
+            uptime=time.monotonic() - self.started_mono,
+            reconnects=self.reconnects,
+            loop_lag=self.loop_stats() if self.loop_stats else None,
+        )
+        return _snapshot
+
+    async def _run(self):
+        while True:
+            try:
+                self.publish()
+            except Exception as e:
+                logger.error(f"Failed to publish health snapshot: {e}")
+            await asyncio.sleep(self.interval)
@@ -1,60 +1,214 @@
-from flask import Flask, request
+from aiohttp import web
+import asyncio
 import threading
 import logging
-from datetime import datetime
+from config import Config
+from probe_stats import probe_stats
+from health import current_snapshot
+from alert_history import alert_history
+from metrics import HTTP_PROBES, registry
 
-# Configure logging for Flask
+# Logger for Flask/aiohttp access logs (level set in log_setup)
 log = logging.getLogger('werkzeug')
-log.setLevel(logging.INFO)
 
 # Configure custom logger
 logger = logging.getLogger('keep_alive')
 
-app = Flask(__name__)
+HOME_TEXT = "🚨 Alerte Percepteur Bot is running! 🚨"
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
 
-@app.route('/')
-def home():
-    logger.info(f"🏠 Page d'accueil visitée depuis {request.remote_addr}")
-    return "🚨 Alerte Percepteur Bot is running! 🚨"
+# Compteurs de requêtes par route, résolus une fois
+_route_counters = {route: HTTP_PROBES.labels(route) for route in ('/', '/status', '/healthz', '/ping', '/metrics', '/stats')}
 
-@app.route('/status')
-def status():
-    logger.info(f"📊 Status vérifié depuis {request.remote_addr}")
+# ---------------------------------------------------------------------------
+# Logique commune aux deux serveurs (Flask et aiohttp)
+# ---------------------------------------------------------------------------
+
+def home_page(user_agent, remote_addr):
+    _route_counters['/'].inc()
+    probe_stats.record('/', user_agent, remote_addr)
+    return HOME_TEXT
+
+def bot_state():
+    """Dernier état publié par le bot (None tant que rien n'a été publié)"""
+    snapshot = current_snapshot()
+    return snapshot.to_dict(Config.HEALTH_STALE_SECONDS) if snapshot else None
+
+def status_payload(user_agent, remote_addr):
+    _route_counters['/status'].inc()
+    probe_stats.record('/status', user_agent, remote_addr)
+    state = bot_state()
+    healthy = bool(state and state["healthy"])
     return {
-        "status": "online",
+        "status": "online" if healthy else "degraded",
         "bot": "Alerte Percepteur",
-        "message": "Bot Discord opérationnel"
+        "message": "Bot Discord opérationnel" if healthy else "Gateway Discord déconnectée ou inactive",
+        "bot_state": state,
+        "probes": probe_stats.snapshot()
     }
 
-@app.route('/ping')
-def ping():
-    current_time = datetime.now().strftime("%H:%M:%S")
-    user_agent = request.headers.get('User-Agent', 'Unknown')
-    remote_addr = request.remote_addr or 'Unknown'
-    
-    # Identifier le type de requête
-    if 'cron-job.org' in user_agent.lower():
-        source_type = "🕒 CRON-JOB"
-    elif 'github-actions' in user_agent.lower():
-        source_type = "🐙 GITHUB-ACTIONS"
-    elif remote_addr.startswith('172.31.') if remote_addr != 'Unknown' else False:
-        source_type = "🏠 REPLIT-INTERNE"
-    else:
-        source_type = "🌐 EXTERNE"
-    
-    logger.info(f"🔄 PING {source_type} depuis {remote_addr} à {current_time}")
-    logger.info(f"   User-Agent: {user_agent}")
-    
+def healthz_payload(user_agent, remote_addr):
+    """
+    Retourne (payload, code HTTP) : 200 si la gateway est saine, 503 sinon
+    """
+    _route_counters['/healthz'].inc()
+    probe_stats.record('/healthz', user_agent, remote_addr)
+    state = bot_state()
+    healthy = bool(state and state["healthy"])
+    return {"healthy": healthy, "bot_state": state}, 200 if healthy else 503
+
+def handle_ping(user_agent, remote_addr):
+    # Pas de log par requête : les sondes sont agrégées et résumées périodiquement
+    _route_counters['/ping'].inc()
+    probe_stats.record('/ping', user_agent, remote_addr)
     return "pong"
 
-def run():
-    """Lance le serveur Flask sur le port 5000"""
-    app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
+def metrics_text():
+    """Export Prometheus des métriques du bot"""
+    _route_counters['/metrics'].inc()
+    return registry.render()
+
+def stats_payload():
+    """
+    Retourne (payload, code HTTP) des statistiques d'alertes (lecture disque, bloquant)
+    """
+    _route_counters['/stats'].inc()
+    stats = alert_history.stats(Config.STATS_DAYS)
+    if stats is None:
+        return {"error": "Historique des alertes indisponible"}, 503
+    return stats, 200
+
+# ---------------------------------------------------------------------------
+# Backend Flask (thread séparé)
+# ---------------------------------------------------------------------------
+
+_flask_app = None
+
+def create_flask_app():
+    """
+    Construit l'application Flask
+
+    Flask n'est importé qu'ici : avec le backend aiohttp (ou sans serveur web),
+    le démarrage ne paie pas son import.
+    """
+    from flask import Flask, request
+
+    flask_app = Flask(__name__)
+
+    def _flask_client():
+        return request.headers.get('User-Agent', 'Unknown'), request.remote_addr or 'Unknown'
+
+    @flask_app.route('/')
+    def home():
+        return home_page(*_flask_client())
+
+    @flask_app.route('/status')
+    def status():
+        return status_payload(*_flask_client())
+
+    @flask_app.route('/healthz')
+    def healthz():
+        return healthz_payload(*_flask_client())
+
+    @flask_app.route('/metrics')
+    def metrics():
+        return metrics_text(), 200, {'Content-Type': METRICS_CONTENT_TYPE}
+
+    @flask_app.route('/stats')
+    def stats():
+        return stats_payload()
+
+    @flask_app.route('/ping')
+    def ping():
+        return handle_ping(*_flask_client())
 
-def start_web_server():
+    return flask_app
+
+def get_flask_app():
+    """L'application Flask du module, construite au premier appel"""
+    global _flask_app
+    if _flask_app is None:
+        _flask_app = create_flask_app()
+    return _flask_app
+
+def __getattr__(name):
+    # keep_alive.app reste disponible, construite à la demande
+    if name == 'app':
+        return get_flask_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def run(port=None):
+    """Lance le serveur Flask sur le port configuré"""
+    get_flask_app().run(host='0.0.0.0', port=port or Config.WEB_SERVER_PORT, debug=False, use_reloader=False)
+
+def start_web_server(port=None):
     """Lance le serveur web dans un thread séparé"""
+    port = port or Config.WEB_SERVER_PORT
     print("🌐 Démarrage du serveur web pour UptimeRobot...")
-    t = threading.Thread(target=run)
+    t = threading.Thread(target=run, args=(port,))
     t.daemon = True
     t.start()
-    print("✅ Serveur web démarré sur le port 5000")
\ No newline at end of file
+    print(f"✅ Serveur web démarré sur le port {port}")
+
+# ---------------------------------------------------------------------------
+# Backend aiohttp (boucle asyncio du bot)
+# ---------------------------------------------------------------------------
+
+def _aio_client(request: web.Request):
+    return request.headers.get('User-Agent', 'Unknown'), request.remote or 'Unknown'
+
+async def aio_home(request: web.Request) -> web.Response:
+    return web.Response(text=home_page(*_aio_client(request)))
+
+async def aio_status(request: web.Request) -> web.Response:
+    return web.json_response(status_payload(*_aio_client(request)))
+
+async def aio_healthz(request: web.Request) -> web.Response:
+    payload, code = healthz_payload(*_aio_client(request))
+    return web.json_response(payload, status=code)
+
+async def aio_metrics(request: web.Request) -> web.Response:
+    return web.Response(body=metrics_text().encode('utf-8'), headers={'Content-Type': METRICS_CONTENT_TYPE})
+
+async def aio_stats(request: web.Request) -> web.Response:
+    # Lecture SQLite hors de la boucle du bot
+    payload, code = await asyncio.to_thread(stats_payload)
+    return web.json_response(payload, status=code)
+
+async def aio_ping(request: web.Request) -> web.Response:
+    return web.Response(text=handle_ping(*_aio_client(request)))
+
+def create_aiohttp_app() -> web.Application:
+    """Construit l'application aiohttp avec les mêmes routes que Flask"""
+    aio_app = web.Application()
+    aio_app.router.add_get('/', aio_home)
+    aio_app.router.add_get('/status', aio_status)
+    aio_app.router.add_get('/healthz', aio_healthz)
+    aio_app.router.add_get('/metrics', aio_metrics)
+    aio_app.router.add_get('/stats', aio_stats)
+    aio_app.router.add_get('/ping', aio_ping)
+    return aio_app
+
+async def start_async_web_server(port=None) -> web.AppRunner:
+    """
+    Lance le serveur web sur la boucle asyncio courante
+
+    Args:
+        port: Le port d'écoute (par défaut Config.WEB_SERVER_PORT)
+
+    Returns:
+        web.AppRunner: Le runner à passer à stop_async_web_server à l'arrêt
+    """
+    port = port or Config.WEB_SERVER_PORT
+    print("🌐 Démarrage du serveur web asyncio pour UptimeRobot...")
+    runner = web.AppRunner(create_aiohttp_app(), access_log=log)
+    await runner.setup()
+    site = web.TCPSite(runner, host='0.0.0.0', port=port)
+    await site.start()
+    print(f"✅ Serveur web démarré sur le port {port}")
+    return runner
+
+async def stop_async_web_server(runner: web.AppRunner):
+    """Arrête proprement le serveur aiohttp"""
+    await runner.cleanup()
+    logger.info("Web server stopped")
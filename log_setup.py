@@ -0,0 +1,196 @@
+import atexit
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from typing import List, Optional
+from batch_queue import STOP, drain_batches
+from config import Config
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Mise en texte des traces d'exception dans le thread appelant
+_EXC_FORMATTER = logging.Formatter()
+
+
+class FastQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler qui formate le minimum dans le thread appelant
+
+    Le QueueHandler standard formate toute la ligne avant de la mettre en
+    file. Ici seul le message est figé dans le thread appelant : ses
+    arguments % (discord.py passe des objets vivants) et la trace d'une
+    exception sont convertis en texte tant qu'ils sont encore dans l'état
+    du moment. La date, le niveau et la mise en ligne sont faits par le
+    thread d'écriture.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class RotatingGzipFile:
+    """
+    Fichier de log avec rotation par taille et/ou par âge
+
+    Les anciens segments sont compressés en gzip : bot.log.1.gz, bot.log.2.gz, ...
+    L'âge d'un segment part de sa première ligne, relue sur disque à
+    l'ouverture : il survit aux redémarrages du bot. N'est utilisé que
+    depuis le thread d'écriture, il n'a donc pas de verrou.
+    """
+
+    def __init__(self, path: str, max_bytes: int, max_age: float, backup_count: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+        self._open()
+
+    def _open(self):
+        self.stream = open(self.path, 'a', encoding='utf-8')
+        self.size = self.stream.tell()
+        self.started_at: Optional[float] = self._first_write_time() if self.size else None
+
+    def _first_write_time(self) -> float:
+        """Date de la première ligne du segment (asctime de LOG_FORMAT), à défaut sa date de modification"""
+        try:
+            with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+                first_line = f.readline(64)
+            return time.mktime(time.strptime(first_line[:19], '%Y-%m-%d %H:%M:%S'))
+        except (OSError, ValueError):
+            return os.path.getmtime(self.path)
+
+    def write(self, data: str):
+        if self.size and self._should_rotate():
+            self.rotate()
+        if self.started_at is None:
+            self.started_at = time.time()
+        self.stream.write(data)
+        self.stream.flush()
+        self.size += len(data.encode('utf-8'))
+
+    def _should_rotate(self) -> bool:
+        if self.max_bytes and self.size >= self.max_bytes:
+            return True
+        return bool(self.max_age) and time.time() - self.started_at >= self.max_age
+
+    def rotate(self):
+        """Compresse le segment courant et décale les anciens segments"""
+        self.stream.close()
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                src = f"{self.path}.{i}.gz"
+                if os.path.exists(src):
+                    os.replace(src, f"{self.path}.{i + 1}.gz")
+            with open(self.path, 'rb') as f_in, gzip.open(f"{self.path}.1.gz", 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out)
+        os.remove(self.path)
+        self._open()
+
+    def close(self):
+        self.stream.close()
+
+
+class BatchLogWriter(threading.Thread):
+    """
+    Thread d'arrière-plan qui vide la file de logs par lots
+
+    Attend un premier record, récupère tout ce qui est déjà en file (jusqu'à
+    batch_size), puis écrit le lot en une seule fois sur la console et dans
+    le fichier. Un lot partiel est écrit au plus tard après flush_interval.
+    """
+
+    def __init__(self, log_queue: queue.SimpleQueue, formatter: logging.Formatter,
+                 log_file: Optional[RotatingGzipFile], console=sys.stderr,
+                 batch_size: int = 256, flush_interval: float = 1.0):
+        super().__init__(name='log-writer', daemon=True)
+        self.queue = log_queue
+        self.formatter = formatter
+        self.log_file = log_file
+        self.console = console
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+    def run(self):
+        drain_batches(self.queue, self._write, self.batch_size, self.flush_interval)
+        if self.log_file:
+            self.log_file.close()
+
+    def _write(self, batch: List[logging.LogRecord]):
+        lines = []
+        for record in batch:
+            try:
+                lines.append(self.formatter.format(record))
+            except Exception:
+                lines.append(f"<log formatting error: {record.msg!r}>")
+        data = '\n'.join(lines) + '\n'
+        try:
+            if self.console:
+                self.console.write(data)
+                self.console.flush()
+            if self.log_file:
+                self.log_file.write(data)
+        except Exception as e:
+            sys.stderr.write(f"Log writer error: {e}\n")
+
+    def stop(self):
+        """Vide la file puis arrête le thread"""
+        self.queue.put(STOP)
+        self.join(timeout=5)
+
+
+def _parse_level(name: str) -> int:
+    level = logging.getLevelName(name.upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+def setup_logging() -> BatchLogWriter:
+    """
+    Configure le pipeline de logs non bloquant
+
+    Tous les loggers écrivent dans une file via FastQueueHandler ; un unique
+    BatchLogWriter écrit les lots sur la console et dans Config.LOG_FILE.
+
+    Returns:
+        BatchLogWriter: Le thread d'écriture (arrêté automatiquement à la sortie)
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    log_file = None
+    if Config.LOG_FILE:
+        log_file = RotatingGzipFile(
+            Config.LOG_FILE,
+            max_bytes=Config.LOG_MAX_BYTES,
+            max_age=Config.LOG_ROTATE_SECONDS,
+            backup_count=Config.LOG_BACKUP_COUNT
+        )
+
+    writer = BatchLogWriter(log_queue, logging.Formatter(LOG_FORMAT), log_file)
+    writer.start()
+    atexit.register(writer.stop)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(FastQueueHandler(log_queue))
+    apply_log_levels()
+
+    return writer
+
+
+def apply_log_levels(config=Config):
+    """Applique les niveaux de logs configurés (aussi appelé au rechargement de la configuration)"""
+    logging.getLogger().setLevel(_parse_level(config.LOG_LEVEL))
+    for logger_name, level_name in config.LOGGER_LEVELS.items():
+        logging.getLogger(logger_name).setLevel(_parse_level(level_name))
@@ -0,0 +1,289 @@
+import bisect
+import functools
+import math
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import aiohttp
+from health import current_snapshot
+
+# Bornes (secondes) des histogrammes de latence
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _CounterChild:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+
+class _HistogramChild:
+    """Série d'un histogramme : compteurs pré-alloués, une borne par case"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric:
+    """
+    Métrique avec au plus un label
+
+    Les séries sont créées une fois par valeur de label puis réutilisées : le
+    code appelant récupère la série avec labels() au chargement et n'alloue
+    plus rien à l'enregistrement. Les incréments ne prennent pas de verrou ;
+    ils sont faits depuis la boucle du bot (et, pour les sondes, depuis le
+    thread Flask), une mise à jour perdue étant acceptable pour des métriques.
+    """
+
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, label: Optional[str] = None):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self._children: Dict[str, object] = {}
+        if label is None:
+            self._default = self._children[''] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, value: str):
+        """Retourne (en la créant au besoin) la série pour cette valeur de label"""
+        child = self._children.get(value)
+        if child is None:
+            child = self._children[value] = self._new_child()
+        return child
+
+    def _series_name(self, suffix: str, value: str, extra: str = '') -> str:
+        labels = []
+        if self.label is not None:
+            labels.append(f'{self.label}="{_escape(value)}"')
+        if extra:
+            labels.append(extra)
+        return f"{self.name}{suffix}{{{','.join(labels)}}}" if labels else f"{self.name}{suffix}"
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for value, child in list(self._children.items()):
+            lines.extend(self._render_child(value, child))
+        return lines
+
+    def _render_child(self, value: str, child) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: int = 1):
+        self._default.inc(amount)
+
+    def _render_child(self, value, child):
+        return [f"{self._series_name('', value)} {_format_value(child.value)}"]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, label: Optional[str] = None,
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, label)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def _render_child(self, value, child):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), list(child.counts)):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self._series_name('_bucket', value, le)} {cumulative}")
+        lines.append(f"{self._series_name('_sum', value)} {_format_value(child.sum)}")
+        lines.append(f"{self._series_name('_count', value)} {child.count}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Jauge lue à l'export via une fonction (aucun coût hors /metrics)"""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], Optional[float]]):
+        self.read = read
+        super().__init__(name, help_text)
+
+    def _new_child(self):
+        return None
+
+    def _render_child(self, value, child):
+        current = self.read()
+        if current is None:
+            return []
+        return [f"{self.name} {_format_value(current)}"]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Export au format texte Prometheus"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def _gateway_latency() -> Optional[float]:
+    snapshot = current_snapshot()
+    if snapshot is None or snapshot.latency_ms is None:
+        return None
+    return snapshot.latency_ms / 1000
+
+
+registry = MetricsRegistry()
+
+COMMAND_DURATION = registry.register(Histogram(
+    'discord_command_duration_seconds',
+    'Durée des commandes préfixe, slash et callbacks de boutons',
+    label='command'
+))
+ALERT_STAGE_DURATION = registry.register(Histogram(
+    'discord_alert_stage_duration_seconds',
+    "Durée des étapes d'une alerte (ack, delivery, followup)",
+    label='stage'
+))
+ERRORS = registry.register(Counter(
+    'discord_errors_total',
+    'Erreurs par type (commandes et envoi des alertes)',
+    label='type'
+))
+ALERTS_THROTTLED = registry.register(Counter(
+    'discord_alerts_throttled_total',
+    "Appuis sur le bouton d'alerte refusés par l'anti-spam",
+    label='scope'
+))
+RATE_LIMITED = registry.register(Counter(
+    'discord_rest_ratelimited_total',
+    'Réponses 429 reçues de l\'API REST Discord',
+    label='scope'
+))
+HTTP_PROBES = registry.register(Counter(
+    'keepalive_http_requests_total',
+    'Requêtes reçues par le serveur web keep-alive',
+    label='route'
+))
+ALERT_MESSAGES = registry.register(Counter(
+    'discord_alert_messages_total',
+    "Alertes postées (posted) ou regroupées dans un message existant (coalesced : un envoi économisé)",
+    label='outcome'
+))
+REST_QUEUE_WAIT = registry.register(Histogram(
+    'discord_rest_queue_wait_seconds',
+    "Attente des envois REST dans l'ordonnanceur, par priorité",
+    label='priority'
+))
+REST_DROPPED = registry.register(Counter(
+    'discord_rest_dropped_total',
+    "Envois REST abandonnés par l'ordonnanceur (surcharge, éviction, rate limit)",
+    label='priority'
+))
+LOOP_LAG = registry.register(Histogram(
+    'event_loop_lag_seconds',
+    "Retard d'ordonnancement de la boucle asyncio du bot",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+))
+LOOP_STALLS = registry.register(Counter(
+    'event_loop_stalls_total',
+    'Blocages de la boucle asyncio au-delà du seuil du watchdog'
+))
+GATEWAY_LATENCY = registry.register(Gauge(
+    'discord_gateway_latency_seconds',
+    'Latence heartbeat de la gateway Discord',
+    _gateway_latency
+))
+
+
+def timed(command_name: str):
+    """
+    Décorateur qui mesure la durée d'une commande ou d'un callback
+
+    La série de l'histogramme est résolue une seule fois, à la décoration.
+    """
+    child = COMMAND_DURATION.labels(command_name)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def count_error(error_type: str):
+    ERRORS.labels(error_type).inc()
+
+
+def rate_limit_trace() -> aiohttp.TraceConfig:
+    """
+    Compte les 429 de l'API REST, à passer au client (option http_trace)
+
+    discord.py gère et réessaie les 429 en interne sans les exposer : le
+    compteur est incrémenté à la réception de chaque réponse, par le traçage
+    aiohttp de sa session, quel que soit le niveau de logs. Une 429 globale
+    (en-tête X-RateLimit-Global) n'est comptée que dans 'global'.
+    """
+    route = RATE_LIMITED.labels('route')
+    global_ = RATE_LIMITED.labels('global')
+
+    async def on_request_end(session, context, params: aiohttp.TraceRequestEndParams):
+        response = params.response
+        if response.status == 429:
+            is_global = response.headers.get('X-RateLimit-Global', '').lower() == 'true'
+            (global_ if is_global else route).inc()
+
+    trace = aiohttp.TraceConfig()
+    trace.on_request_end.append(on_request_end)
+    return trace
@@ -0,0 +1,99 @@
+import time
+from typing import Dict, FrozenSet, Hashable, Tuple
+import discord
+from config import Config
+
+# Décisions possibles pour un membre
+ALLOWED = 'allowed'
+DENIED_ROLE = 'denied_role'          # Rôles autorisés configurés, aucun ne correspond
+DENIED_MANAGE = 'denied_manage'      # Pas de rôles configurés et pas "Gérer les messages"
+
+
+def decide(member: discord.Member, allowed_role_ids: FrozenSet[int]) -> str:
+    """
+    Calcule la décision de permission d'un membre (sans cache)
+
+    Args:
+        member: Le membre du serveur
+        allowed_role_ids: Les IDs des rôles autorisés (vide = pas de restriction par rôle)
+
+    Returns:
+        str: ALLOWED, DENIED_ROLE ou DENIED_MANAGE
+    """
+    if allowed_role_ids:
+        if allowed_role_ids.isdisjoint(role.id for role in member.roles):
+            return DENIED_ROLE
+        return ALLOWED
+
+    # Si pas de rôles spécifiques configurés, vérifier les permissions Discord
+    if member.guild_permissions and not member.guild_permissions.manage_messages:
+        return DENIED_MANAGE
+    return ALLOWED
+
+
+def _role_key(member: discord.Member) -> Hashable:
+    """
+    Rôles du membre tels que reçus avec l'interaction, sous forme comparable
+
+    Lit Member._roles (IDs bruts du payload, discord.py 2.7.1) pour ne pas
+    construire et trier member.roles à chaque appui.
+    """
+    raw = getattr(member, '_roles', None)
+    if raw is None:
+        return tuple(sorted(role.id for role in member.roles))
+    return raw.tobytes()
+
+
+class PermissionCache:
+    """
+    Cache des décisions de permission par (serveur, membre)
+
+    Un appui répété sur un bouton ne coûte qu'une recherche dans un dict.
+    Chaque décision est liée aux rôles du membre au moment du calcul : les
+    rôles arrivent à jour avec chaque interaction, un membre dont les rôles
+    ont changé est donc réévalué dès l'appui suivant, même sans l'intent
+    members (pas de on_member_update). Les entrées sont aussi invalidées par
+    les événements gateway (mise à jour de rôle, suppression de rôle) et
+    expirent après `ttl` secondes.
+    """
+
+    def __init__(self, ttl: float = 300, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[int, int], Tuple[Hashable, str, float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def check(self, member: discord.Member, allowed_role_ids: FrozenSet[int]) -> str:
+        """Retourne la décision pour le membre, en la calculant si besoin"""
+        key = (member.guild.id, member.id)
+        roles = _role_key(member)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] > now and entry[0] == roles:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        decision = decide(member, allowed_role_ids)
+        if getattr(member.guild, 'unavailable', False):
+            # Serveur pas encore en cache (reprise de session) : rôles incomplets
+            return decision
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        self._entries[key] = (roles, decision, now + self.ttl)
+        return decision
+
+    def invalidate_member(self, guild_id: int, member_id: int):
+        self._entries.pop((guild_id, member_id), None)
+
+    def invalidate_guild(self, guild_id: int):
+        for key in [key for key in self._entries if key[0] == guild_id]:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+
+# Cache partagé par les vues et les événements du bot
+permission_cache = PermissionCache(ttl=Config.PERMISSION_CACHE_TTL)
@@ -0,0 +1,149 @@
+import bisect
+import logging
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Pattern, Tuple
+
+logger = logging.getLogger('keep_alive')
+
+# Règles de classification, compilées une seule fois : (source, motif User-Agent)
+UA_RULES: List[Tuple[str, Pattern]] = [
+    ("CRON-JOB", re.compile(r'cron-job\.org', re.IGNORECASE)),
+    ("GITHUB-ACTIONS", re.compile(r'github-actions', re.IGNORECASE)),
+]
+# Adresses internes du proxy Replit
+INTERNAL_ADDR_PREFIX = '172.31.'
+INTERNAL_SOURCE = "REPLIT-INTERNE"
+EXTERNAL_SOURCE = "EXTERNE"
+
+SOURCE_EMOJIS = {
+    "CRON-JOB": "🕒",
+    "GITHUB-ACTIONS": "🐙",
+    "REPLIT-INTERNE": "🏠",
+    "EXTERNE": "🌐",
+}
+
+# Bornes (en secondes) de l'histogramme des intervalles entre deux pings
+INTERVAL_BUCKETS: Tuple[float, ...] = (10, 30, 60, 120, 180, 300, 600, 1800, 3600)
+INTERVAL_LABELS: Tuple[str, ...] = tuple(f"<={b}s" for b in INTERVAL_BUCKETS) + (f">{INTERVAL_BUCKETS[-1]}s",)
+
+# Taille max du cache de classification (User-Agent, adresse) -> source
+_CLASSIFY_CACHE_SIZE = 256
+
+
+def classify(user_agent: str, remote_addr: str) -> str:
+    """
+    Identifie la source d'un ping
+
+    Args:
+        user_agent: Le User-Agent de la requête
+        remote_addr: L'adresse IP du client
+
+    Returns:
+        str: CRON-JOB, GITHUB-ACTIONS, REPLIT-INTERNE ou EXTERNE
+    """
+    for source, pattern in UA_RULES:
+        if pattern.search(user_agent):
+            return source
+    if remote_addr.startswith(INTERNAL_ADDR_PREFIX):
+        return INTERNAL_SOURCE
+    return EXTERNAL_SOURCE
+
+
+class _SourceStats:
+    """Compteurs d'une source de ping"""
+
+    __slots__ = ('count', 'last_seen', 'last_mono', 'intervals')
+
+    def __init__(self):
+        self.count = 0
+        self.last_seen: Optional[float] = None
+        self.last_mono: Optional[float] = None
+        # Un compteur par borne + un pour "au-delà"
+        self.intervals = [0] * (len(INTERVAL_BUCKETS) + 1)
+
+
+class ProbeStats:
+    """
+    Agrégation en mémoire du trafic keep-alive
+
+    Remplace les deux lignes de log par ping : chaque requête ne fait qu'une
+    recherche dans un petit cache et quelques incréments sous verrou. Les
+    agrégats sont exposés sur /status et résumés périodiquement dans les logs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sources: Dict[str, _SourceStats] = {}
+        self._routes: Dict[str, int] = {}
+        self._classify_cache: Dict[Tuple[str, str], str] = {}
+        self.started_at = time.time()
+
+    def record(self, route: str, user_agent: str, remote_addr: str) -> str:
+        """
+        Enregistre une requête de sonde
+
+        Args:
+            route: La route appelée ('/ping', '/status', ...)
+            user_agent: Le User-Agent de la requête
+            remote_addr: L'adresse IP du client
+
+        Returns:
+            str: La source identifiée
+        """
+        key = (user_agent, remote_addr)
+        source = self._classify_cache.get(key)
+        if source is None:
+            source = classify(user_agent, remote_addr)
+            if len(self._classify_cache) >= _CLASSIFY_CACHE_SIZE:
+                self._classify_cache.clear()
+            self._classify_cache[key] = source
+
+        now_mono = time.monotonic()
+        with self._lock:
+            self._routes[route] = self._routes.get(route, 0) + 1
+            stats = self._sources.get(source)
+            if stats is None:
+                stats = self._sources[source] = _SourceStats()
+            if stats.last_mono is not None:
+                interval = now_mono - stats.last_mono
+                stats.intervals[bisect.bisect_left(INTERVAL_BUCKETS, interval)] += 1
+            stats.count += 1
+            stats.last_mono = now_mono
+            stats.last_seen = time.time()
+        return source
+
+    def snapshot(self) -> dict:
+        """Retourne une copie sérialisable en JSON des agrégats"""
+        now_mono = time.monotonic()
+        with self._lock:
+            sources = {
+                source: {
+                    "count": stats.count,
+                    "last_seen": stats.last_seen,
+                    "seconds_since_last": round(now_mono - stats.last_mono, 1),
+                    "intervals": dict(zip(INTERVAL_LABELS, stats.intervals)),
+                }
+                for source, stats in self._sources.items()
+            }
+            routes = dict(self._routes)
+        return {"since": self.started_at, "routes": routes, "sources": sources}
+
+    def summary(self) -> str:
+        """Résumé sur une ligne, pour le log périodique"""
+        snap = self.snapshot()
+        if not snap["sources"]:
+            return "📡 Aucune sonde reçue"
+        parts = [
+            f"{SOURCE_EMOJIS.get(source, '')} {source}={data['count']} (il y a {data['seconds_since_last']:.0f}s)"
+            for source, data in sorted(snap["sources"].items())
+        ]
+        return "📡 Sondes: " + ", ".join(parts)
+
+    def log_summary(self):
+        logger.info(self.summary())
+
+
+# Instance partagée par les serveurs web et le bot
+probe_stats = ProbeStats()
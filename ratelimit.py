@@ -0,0 +1,131 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+from config import Config
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets par clé, en O(1) et à mémoire bornée
+
+    Chaque clé dispose de `capacity` jetons, rechargés d'un jeton toutes les
+    `refill_seconds` secondes. Un bucket resté inactif assez longtemps pour
+    être plein est équivalent à un bucket neuf : il est supprimé. Les buckets
+    sont gardés dans l'ordre de dernière utilisation, la purge ne regarde
+    donc que le début de la liste (coût amorti constant).
+    """
+
+    def __init__(self, capacity: int, refill_seconds: float, max_keys: int = 10000):
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.max_keys = max_keys
+        # Durée d'inactivité au bout de laquelle un bucket est de nouveau plein
+        self._idle_expiry = capacity * refill_seconds
+        self._buckets: "OrderedDict[Hashable, List[float]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _prune(self, now: float):
+        buckets = self._buckets
+        while buckets:
+            key, (tokens, last) = next(iter(buckets.items()))
+            if now - last < self._idle_expiry and len(buckets) <= self.max_keys:
+                break
+            del buckets[key]
+
+    def acquire(self, key: Hashable, now: Optional[float] = None) -> float:
+        """
+        Consomme un jeton pour la clé
+
+        Returns:
+            float: 0 si le jeton est accordé, sinon le délai (secondes) avant le prochain jeton
+        """
+        if not self.enabled:
+            return 0.0
+        if now is None:
+            now = time.monotonic()
+        self._prune(now)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [self.capacity - 1, now]
+            return 0.0
+
+        self._buckets.move_to_end(key)
+        tokens = min(self.capacity, bucket[0] + (now - bucket[1]) / self.refill_seconds)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) * self.refill_seconds
+
+    def refund(self, key: Hashable):
+        """Rend un jeton consommé (quand un autre bucket a refusé la requête)"""
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket[0] = min(self.capacity, bucket[0] + 1)
+
+
+class AlertRateLimiter:
+    """
+    Limites du bouton d'alerte : par utilisateur, par serveur et par channel
+
+    Une alerte n'est acceptée que si les trois buckets ont un jeton ; si l'un
+    refuse, les jetons déjà pris sont rendus.
+    """
+
+    def __init__(self, user: TokenBucketLimiter, guild: TokenBucketLimiter, channel: TokenBucketLimiter):
+        self.throttled = 0
+        self.reconfigure(user, guild, channel)
+
+    def reconfigure(self, user: TokenBucketLimiter, guild: TokenBucketLimiter, channel: TokenBucketLimiter):
+        """Remplace les trois limites d'un coup (les buckets en cours repartent pleins)"""
+        self.scopes: Tuple[Tuple[str, TokenBucketLimiter], ...] = (
+            ('user', user),
+            ('guild', guild),
+            ('channel', channel),
+        )
+
+    def check(self, user_id: int, guild_id: Optional[int], channel_id: int) -> Optional[Tuple[str, float]]:
+        """
+        Returns:
+            Optional[Tuple[str, float]]: None si l'alerte est autorisée, sinon (portée, délai en secondes)
+        """
+        now = time.monotonic()
+        keys = (user_id, guild_id, channel_id)
+        taken = []
+        for (scope, limiter), key in zip(self.scopes, keys):
+            if key is None:
+                continue
+            retry_after = limiter.acquire(key, now)
+            if retry_after:
+                for taken_limiter, taken_key in taken:
+                    taken_limiter.refund(taken_key)
+                self.throttled += 1
+                return scope, retry_after
+            taken.append((limiter, key))
+        return None
+
+
+def alert_buckets(config=Config) -> Dict[str, TokenBucketLimiter]:
+    """Construit les trois limites du bouton d'alerte depuis la configuration"""
+    return {
+        'user': TokenBucketLimiter(config.ALERT_USER_BUCKET_CAPACITY, config.ALERT_USER_BUCKET_REFILL_SECONDS),
+        'guild': TokenBucketLimiter(config.ALERT_GUILD_BUCKET_CAPACITY, config.ALERT_GUILD_BUCKET_REFILL_SECONDS),
+        'channel': TokenBucketLimiter(config.ALERT_CHANNEL_BUCKET_CAPACITY, config.ALERT_CHANNEL_BUCKET_REFILL_SECONDS),
+    }
+
+
+def build_alert_rate_limiter() -> AlertRateLimiter:
+    """Construit les limites du bouton d'alerte depuis la configuration"""
+    return AlertRateLimiter(**alert_buckets())
+
+
+# Limiteur partagé par les vues
+alert_rate_limiter = build_alert_rate_limiter()
@@ -0,0 +1,206 @@
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+import discord
+from config import Config
+
+# Langue des textes quand celle de l'utilisateur (ou du serveur) n'est pas définie
+DEFAULT_LOCALE = 'fr'
+
+
+class Field(NamedTuple):
+    name: str
+    value: str
+    inline: bool = True
+    prefix_only: bool = False       # Masqué en mode slash uniquement
+
+
+class _Prototype(NamedTuple):
+    """Embed construit une fois par un EmbedTemplate, de quoi en produire des copies"""
+    state: Tuple[Tuple[str, Any], ...]      # Attributs de l'embed (slots définis), sauf les champs
+    fields: Optional[List[dict]]
+    payload: dict                           # discord.Embed.to_dict() de l'embed
+    description: str                        # Avec les {noms} des champs dynamiques
+
+
+class TemplateEmbed(discord.Embed):
+    """
+    Embed produit par un EmbedTemplate
+
+    to_dict(), appelé par discord.py à chaque envoi, retourne le payload
+    préparé par le modèle au lieu de le reconstruire, tant que l'embed n'a
+    pas été modifié : toute modification (attribut, pied de page, champ)
+    l'écarte et to_dict() reconstruit alors le payload normalement. Un embed
+    obtenu par copy() ou from_dict() n'a pas de payload préparé.
+    """
+    __slots__ = ('_payload',)
+
+    @classmethod
+    def _from_prototype(cls, prototype: _Prototype, payload: dict, description: Optional[str] = None) -> 'TemplateEmbed':
+        embed = cls.__new__(cls)
+        for name, value in prototype.state:
+            object.__setattr__(embed, name, value)
+        if prototype.fields is not None:
+            # Liste propre à l'embed ; set_field_at copie le champ avant de le modifier
+            object.__setattr__(embed, '_fields', list(prototype.fields))
+        if description is not None:
+            object.__setattr__(embed, 'description', description)
+        object.__setattr__(embed, '_payload', payload)
+        return embed
+
+    def __setattr__(self, name: str, value):
+        if name != '_payload':
+            object.__setattr__(self, '_payload', None)
+        object.__setattr__(self, name, value)
+
+    # Les champs sont modifiés en place, sans passer par __setattr__
+    def add_field(self, *args, **kwargs):
+        self._payload = None
+        return super().add_field(*args, **kwargs)
+
+    def insert_field_at(self, *args, **kwargs):
+        self._payload = None
+        return super().insert_field_at(*args, **kwargs)
+
+    def set_field_at(self, index: int, *args, **kwargs):
+        self._payload = None
+        fields = getattr(self, '_fields', None)
+        if fields is not None and -len(fields) <= index < len(fields):
+            fields[index] = dict(fields[index])
+        return super().set_field_at(index, *args, **kwargs)
+
+    def remove_field(self, *args, **kwargs):
+        self._payload = None
+        return super().remove_field(*args, **kwargs)
+
+    def clear_fields(self):
+        self._payload = None
+        return super().clear_fields()
+
+    def to_dict(self) -> dict:
+        payload = getattr(self, '_payload', None)
+        return payload if payload is not None else super().to_dict()
+
+
+class EmbedTemplate:
+    """
+    Réponse en embed dont la partie statique n'est construite qu'une fois
+
+    Les textes sont donnés par langue : titre, description, champs et pied
+    de page. `{prefix}` y est remplacé à la construction, faite une fois par
+    (langue, préfixe, mode slash uniquement) ; les noms de `dynamic` ne
+    peuvent apparaître que dans la description et sont remplis à chaque
+    appel de render(). Chaque appel retourne son propre embed, que
+    l'appelant peut modifier sans toucher au modèle.
+    """
+
+    def __init__(self, colour: discord.Colour, texts: Mapping[str, Mapping[str, Any]], dynamic: Tuple[str, ...] = ()):
+        self.colour = colour
+        self.texts = texts
+        self.dynamic = dynamic
+        self._built: Dict[Tuple[str, str, bool], _Prototype] = {}
+
+    def _build(self, key: Tuple[str, str, bool]) -> _Prototype:
+        locale, prefix, slash_only = key
+        texts = self.texts[locale]
+        # Les champs dynamiques restent en place dans la description : {latency} -> {latency}
+        placeholders = {name: f'{{{name}}}' for name in self.dynamic}
+        embed = discord.Embed(
+            title=texts['title'].format(prefix=prefix),
+            description=texts['description'].format(prefix=prefix, **placeholders),
+            colour=self.colour
+        )
+        for field in texts.get('fields', ()):
+            if field.prefix_only and slash_only:
+                continue
+            embed.add_field(name=field.name.format(prefix=prefix), value=field.value.format(prefix=prefix),
+                            inline=field.inline)
+        if 'footer' in texts:
+            embed.set_footer(text=texts['footer'].format(prefix=prefix))
+        prototype = _Prototype(
+            state=tuple((name, getattr(embed, name)) for name in discord.Embed.__slots__
+                        if name != '_fields' and hasattr(embed, name)),
+            fields=getattr(embed, '_fields', None),
+            payload=embed.to_dict(),
+            description=embed.description
+        )
+        self._built[key] = prototype
+        return prototype
+
+    def render(self, locale: Optional[str] = None, **values) -> discord.Embed:
+        """
+        Retourne l'embed dans la langue demandée, la description complétée par `values`
+
+        Args:
+            locale: Code de langue ('fr', 'en'...) ; à défaut DEFAULT_LOCALE
+            **values: Valeurs des champs dynamiques de la description
+        """
+        if locale not in self.texts:
+            locale = DEFAULT_LOCALE
+        key = (locale, Config.COMMAND_PREFIX, Config.SLASH_ONLY)
+        prototype = self._built.get(key)
+        if prototype is None:
+            prototype = self._build(key)
+        if not self.dynamic:
+            return TemplateEmbed._from_prototype(prototype, prototype.payload)
+
+        description = prototype.description.format(**values)
+        return TemplateEmbed._from_prototype(prototype, {**prototype.payload, 'description': description}, description)
+
+
+def locale_of(source) -> str:
+    """
+    Langue d'une interaction (celle du client Discord) ou d'un contexte de
+    commande préfixe (langue préférée du serveur), réduite à son code ('fr', 'en')
+    """
+    locale = getattr(source, 'locale', None)
+    if locale is None:
+        locale = getattr(getattr(source, 'guild', None), 'preferred_locale', None)
+    return str(locale).split('-')[0] if locale else DEFAULT_LOCALE
+
+
+# Réponses des commandes, communes aux versions préfixe et slash
+PING = EmbedTemplate(
+    discord.Colour.green(),
+    {'fr': {'title': "🏓 Pong!", 'description': "Latence: {latency}ms"}},
+    dynamic=('latency',)
+)
+
+HELLO = EmbedTemplate(
+    discord.Colour.blue(),
+    {'fr': {'title': "👋 Salut!", 'description': "Bonjour {mention}! Comment allez-vous?"}},
+    dynamic=('mention',)
+)
+
+HELP = EmbedTemplate(
+    discord.Colour.purple(),
+    {'fr': {
+        'title': "📚 Aide - Alerte Percepteur",
+        'description': "Voici les commandes disponibles:",
+        'fields': (
+            Field(
+                "Commandes Slash",
+                "`/ping` - Teste la latence\n"
+                "`/hello` - Salue l'utilisateur\n"
+                "`/buttons` - Affiche les boutons interactifs\n"
+                "`/stats` - Statistiques des alertes\n"
+                "`/help` - Affiche cette aide",
+                inline=False
+            ),
+            Field(
+                "Commandes Préfixe",
+                "`{prefix}ping` - Teste la latence\n"
+                "`{prefix}hello` - Salue l'utilisateur",
+                inline=False,
+                prefix_only=True
+            ),
+        ),
+        'footer': "Alerte Percepteur - Bot créé avec discord.py",
+    }}
+)
+
+BUTTONS = EmbedTemplate(
+    discord.Colour.orange(),
+    {'fr': {
+        'title': "🚨 Alerte Percepteur🚨",
+        'description': "😎 Ce Bot codé par Viti vous permet de ping rapidement les niveaux 200 en cas d'attaque ! 😎",
+    }}
+)
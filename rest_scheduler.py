@@ -0,0 +1,296 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Set
+import discord
+from config import Config
+from metrics import REST_DROPPED, REST_QUEUE_WAIT
+
+logger = logging.getLogger('discord_bot')
+
+
+class Priority(IntEnum):
+    """Classes de priorité des envois sortants (plus petit = plus prioritaire)"""
+    ALERT = 0           # Alertes percepteur
+    INTERACTION = 1     # Follow-ups et confirmations
+    COSMETIC = 2        # Présence, synchro des commandes, contenu non essentiel
+
+
+class RequestDropped(Exception):
+    """L'envoi a été abandonné par l'ordonnanceur (surcharge ou rate limit)"""
+
+
+class RequestExpired(RequestDropped):
+    """L'envoi n'a pas pu partir avant son échéance (il n'a jamais commencé)"""
+
+
+class _Job:
+    __slots__ = ('priority', 'seq', 'route', 'factory', 'future', 'queued_at', 'deadline')
+
+    def __init__(self, priority: Priority, seq: int, route: str,
+                 factory: Callable[[], Awaitable[Any]], future: asyncio.Future,
+                 deadline: Optional[float] = None):
+        self.priority = priority
+        self.seq = seq
+        self.route = route
+        self.factory = factory
+        self.future = future
+        self.queued_at = time.perf_counter()
+        self.deadline = deadline
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Délai demandé par Discord pour une erreur de rate limit, None sinon"""
+    if isinstance(error, discord.RateLimited):
+        return error.retry_after
+    if isinstance(error, discord.HTTPException) and error.status == 429:
+        try:
+            return float(error.response.headers.get('Retry-After', 1))
+        except (TypeError, ValueError):
+            return 1.0
+    return None
+
+
+class RestScheduler:
+    """
+    Ordonnanceur des envois REST sortants, par priorité et par route
+
+    Chaque envoi est soumis avec une priorité et une clé de route
+    ('channel:<id>', 'interaction:<id>', 'presence'...). Les workers prennent
+    toujours le job le plus prioritaire dont la route est libre : une route
+    n'a qu'un envoi en vol à la fois et, après un 429, reste en pause le
+    temps demandé par Discord pendant que les autres routes avancent.
+
+    La file est bornée : sous pression, les envois COSMETIC sont refusés dès
+    que la file est à moitié pleine ; quand elle est pleine, un nouvel envoi
+    évince le job le moins prioritaire, ou attend une place (back-pressure)
+    s'il n'y a rien de moins prioritaire à évincer. Un job ALERT ou
+    INTERACTION rate-limité est remis en file ; un job COSMETIC est abandonné.
+
+    Les jobs sont rangés par priorité puis par route, dans une file FIFO
+    chacune : un dispatch ne regarde que la tête de chaque file, sans trier
+    toute la file d'attente.
+    """
+
+    def __init__(self, concurrency: int = 4, max_queue: int = 100, shed_ratio: float = 0.5):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.shed_threshold = max(1, int(max_queue * shed_ratio))
+        self._queues: Dict[Priority, Dict[str, Deque[_Job]]] = {priority: {} for priority in Priority}
+        self._size = 0
+        self._seq = itertools.count()
+        self._busy: Set[str] = set()
+        self._cooldowns: Dict[str, float] = {}
+        self._cond: Optional[asyncio.Condition] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _jobs(self) -> Iterator[_Job]:
+        for routes in self._queues.values():
+            for queue in routes.values():
+                yield from queue
+
+    def _push(self, job: _Job, front: bool = False):
+        queue = self._queues[job.priority].setdefault(job.route, deque())
+        if front:
+            queue.appendleft(job)
+        else:
+            queue.append(job)
+        self._size += 1
+
+    def _take(self, queue: Deque[_Job], job: _Job):
+        """Retire `job` de sa file (supprimée si elle devient vide)"""
+        if queue[0] is job:
+            queue.popleft()
+        elif queue[-1] is job:
+            queue.pop()
+        else:
+            queue.remove(job)
+        if not queue:
+            del self._queues[job.priority][job.route]
+        self._size -= 1
+
+    def _remove(self, job: _Job) -> bool:
+        """Retire un job encore en file ; False s'il n'y est plus (parti ou abandonné)"""
+        queue = self._queues[job.priority].get(job.route)
+        if queue is None or job not in queue:
+            return False
+        self._take(queue, job)
+        return True
+
+    def start(self):
+        """Démarre les workers sur la boucle courante"""
+        if self.running:
+            return
+        self._cond = asyncio.Condition()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f'rest-worker-{i}')
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        """Arrête les workers ; les envois encore en file sont abandonnés"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in list(self._jobs()):
+            self._drop(job, "scheduler stopped")
+        for routes in self._queues.values():
+            routes.clear()
+        self._size = 0
+
+    async def run(self, priority: Priority, route: str, factory: Callable[[], Awaitable[Any]],
+                  deadline: Optional[float] = None) -> Any:
+        """
+        Soumet un envoi et attend son résultat
+
+        Args:
+            priority: La classe de priorité
+            route: La clé de route (bucket de rate limit Discord)
+            factory: Fonction sans argument qui crée la coroutine d'envoi
+            deadline: Échéance (time.monotonic()) pour démarrer l'envoi ; un envoi
+                      commencé n'est jamais abandonné, son résultat est toujours attendu
+
+        Raises:
+            RequestExpired: Si l'envoi n'a pas démarré avant `deadline`
+            RequestDropped: Si l'envoi a été abandonné
+        """
+        if not self.running:
+            return await factory()
+
+        async with self._cond:
+            if priority == Priority.COSMETIC and self._size >= self.shed_threshold:
+                REST_DROPPED.labels(priority.name).inc()
+                raise RequestDropped(f"queue under pressure ({self._size} pending)")
+            while self._size >= self.max_queue:
+                if not self._evict_below(priority):
+                    await self._cond.wait()
+            job = _Job(priority, next(self._seq), route, factory, asyncio.get_running_loop().create_future(), deadline)
+            self._push(job)
+            self._cond.notify_all()
+        if deadline is None:
+            return await job.future
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(job.future), timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            pass
+        async with self._cond:
+            # Encore en file (ou remis en file après un 429) : il n'est pas parti
+            if self._remove(job):
+                self._expire(job)
+                self._cond.notify_all()
+        return await job.future
+
+    def _evict_below(self, priority: Priority) -> bool:
+        """Évince le job en file le moins prioritaire, s'il l'est moins que `priority`"""
+        for level in reversed(Priority):
+            if level <= priority:
+                return False
+            routes = self._queues[level]
+            if routes:
+                # Le plus récent de la classe : la queue de file au plus grand numéro
+                queue = max(routes.values(), key=lambda queue: queue[-1].seq)
+                victim = queue[-1]
+                self._take(queue, victim)
+                self._drop(victim, "evicted by higher priority traffic")
+                return True
+        return False
+
+    def _drop(self, job: _Job, reason: str):
+        REST_DROPPED.labels(job.priority.name).inc()
+        if not job.future.done():
+            job.future.set_exception(RequestDropped(reason))
+
+    def _expire(self, job: _Job):
+        REST_DROPPED.labels(job.priority.name).inc()
+        if not job.future.done():
+            job.future.set_exception(RequestExpired(f"not dispatched within its deadline on {job.route}"))
+
+    def _pop_ready(self) -> Optional[_Job]:
+        """Retire le job le plus prioritaire (puis le plus ancien) dont la route est disponible"""
+        now = time.monotonic()
+        for routes in self._queues.values():
+            best: Optional[Deque[_Job]] = None
+            for route, queue in routes.items():
+                if route in self._busy or self._cooldowns.get(route, 0) > now:
+                    continue
+                if best is None or queue[0].seq < best[0].seq:
+                    best = queue
+            if best is not None:
+                job = best[0]
+                self._take(best, job)
+                return job
+        return None
+
+    def _next_wakeup(self) -> Optional[float]:
+        now = time.monotonic()
+        pending = [until - now for until in self._cooldowns.values() if until > now]
+        return min(pending) if pending else None
+
+    async def _worker(self):
+        while True:
+            async with self._cond:
+                job = self._pop_ready()
+                while job is None:
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), timeout=self._next_wakeup())
+                    except asyncio.TimeoutError:
+                        pass
+                    job = self._pop_ready()
+                self._busy.add(job.route)
+                # Une place s'est libérée dans la file
+                self._cond.notify_all()
+
+            if job.future.cancelled():
+                await self._release(job.route)
+                continue
+            if job.deadline is not None and time.monotonic() >= job.deadline:
+                self._expire(job)
+                await self._release(job.route)
+                continue
+
+            REST_QUEUE_WAIT.labels(job.priority.name).observe(time.perf_counter() - job.queued_at)
+            requeue = False
+            try:
+                result = await job.factory()
+            except Exception as e:
+                retry_after = _retry_after(e)
+                if retry_after is None:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+                else:
+                    self._cooldowns[job.route] = time.monotonic() + retry_after
+                    logger.warning(f"Route {job.route} rate limited for {retry_after:.1f}s ({job.priority.name})")
+                    requeue = job.priority < Priority.COSMETIC
+                    if not requeue:
+                        self._drop(job, f"rate limited for {retry_after:.1f}s")
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+            await self._release(job.route, job if requeue else None)
+
+    async def _release(self, route: str, requeue: Optional[_Job] = None):
+        async with self._cond:
+            self._busy.discard(route)
+            if requeue is not None:
+                # Il était en tête de sa file (une route n'a qu'un envoi en vol) : il y retourne
+                self._push(requeue, front=True)
+            now = time.monotonic()
+            for key in [key for key, until in self._cooldowns.items() if until <= now]:
+                del self._cooldowns[key]
+            self._cond.notify_all()
+
+
+# Ordonnanceur partagé, démarré dans DiscordBot.setup_hook
+rest_scheduler = RestScheduler(concurrency=Config.REST_CONCURRENCY, max_queue=Config.REST_QUEUE_SIZE)
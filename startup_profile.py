@@ -0,0 +1,65 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger('discord_bot')
+
+
+class StartupProfile:
+    """
+    Durées des phases du démarrage, jusqu'au premier ready
+
+    L'origine est l'import de ce module (en tête de bot.py, avant discord.py).
+    `mark` clôt une phase séquentielle commencée à la marque précédente ;
+    `phase` (contexte) et `record` mesurent une phase quelconque, qui peut en
+    englober d'autres (setup_hook s'exécute pendant le login). Le relevé ne
+    coûte que quelques perf_counter : il est toujours actif, seul le rapport
+    détaillé dépend de STARTUP_PROFILE.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self._last = self.origin
+        self.phases: List[Tuple[str, float, float]] = []
+        self.reported = False
+
+    def mark(self, name: str):
+        now = time.perf_counter()
+        self.record(name, self._last, now)
+        self._last = now
+
+    def record(self, name: str, start: float, end: Optional[float] = None):
+        self.phases.append((name, start, end if end is not None else time.perf_counter()))
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start)
+
+    def elapsed(self) -> float:
+        """Secondes écoulées depuis l'origine"""
+        return time.perf_counter() - self.origin
+
+    def report(self) -> List[str]:
+        """Une ligne par phase : début depuis l'origine, durée et nom, dans l'ordre de début"""
+        return [
+            f"{(start - self.origin) * 1000:>8.1f} ms  +{(end - start) * 1000:>8.1f} ms  {name}"
+            for name, start, end in sorted(self.phases, key=lambda phase: phase[1])
+        ]
+
+    def log_report(self):
+        """Journalise le détail des phases (une seule fois)"""
+        if self.reported:
+            return
+        self.reported = True
+        logger.info(f"Startup profile ({self.elapsed():.2f}s to ready):")
+        for line in self.report():
+            logger.info(f"  {line}")
+
+
+# Profil du processus, démarré à l'import par bot.py
+startup_profile = StartupProfile()
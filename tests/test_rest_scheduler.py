@@ -0,0 +1,172 @@
+"""
+Tests de l'ordonnanceur REST (rest_scheduler.py)
+
+Les envois passent par le vrai client HTTP de discord.py, pointé sur le faux
+serveur de benchmarks/fake_discord.py.
+
+Usage:
+    python -m pytest tests
+"""
+import asyncio
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import discord  # noqa: E402
+from discord.http import HTTPClient, Route, handle_message_parameters  # noqa: E402
+from fake_discord import FakeDiscord  # noqa: E402
+from rest_scheduler import Priority, RequestDropped, RequestExpired, RestScheduler  # noqa: E402
+
+
+@asynccontextmanager
+async def fake_http(latency: float = 0.05):
+    """Client HTTP discord.py connecté à un faux serveur sans 429"""
+    server = FakeDiscord(latency=latency, jitter=0)
+    base = Route.BASE
+    Route.BASE = await server.start()
+    http = HTTPClient(asyncio.get_running_loop())
+    await http.static_login('fake-token')
+    try:
+        yield server, http
+    finally:
+        await http.close()
+        await server.stop()
+        Route.BASE = base
+
+
+def send(http: HTTPClient, channel_id: int):
+    return lambda: http.send_message(channel_id, params=handle_message_parameters(content='x'))
+
+
+async def wait_started(server: FakeDiscord, count: int = 1):
+    """Attend que le faux serveur ait reçu `count` requêtes"""
+    while sum(server.requests.values()) < count:
+        await asyncio.sleep(0.005)
+
+
+def test_alerts_are_dispatched_before_queued_traffic():
+    async def scenario():
+        async with fake_http() as (server, http):
+            scheduler = RestScheduler(concurrency=1, max_queue=10)
+            scheduler.start()
+            busy = asyncio.create_task(scheduler.run(Priority.INTERACTION, 'channel:1', send(http, 1)))
+            await wait_started(server)
+            cosmetic = asyncio.create_task(scheduler.run(Priority.COSMETIC, 'channel:2', send(http, 2)))
+            interaction = asyncio.create_task(scheduler.run(Priority.INTERACTION, 'channel:3', send(http, 3)))
+            alert = asyncio.create_task(scheduler.run(Priority.ALERT, 'channel:4', send(http, 4)))
+            await asyncio.gather(busy, cosmetic, interaction, alert)
+            await scheduler.stop()
+            return [route for _, route, _ in server.timeline]
+
+    assert asyncio.run(scenario()) == ['channel:1', 'channel:4', 'channel:3', 'channel:2']
+
+
+def test_full_queue_evicts_the_newest_lower_priority_job():
+    async def scenario():
+        async with fake_http() as (server, http):
+            scheduler = RestScheduler(concurrency=1, max_queue=2)
+            scheduler.start()
+            busy = asyncio.create_task(scheduler.run(Priority.ALERT, 'channel:1', send(http, 1)))
+            await wait_started(server)
+            older = asyncio.create_task(scheduler.run(Priority.INTERACTION, 'channel:2', send(http, 2)))
+            newer = asyncio.create_task(scheduler.run(Priority.INTERACTION, 'channel:3', send(http, 3)))
+            await asyncio.sleep(0)
+            alert = asyncio.create_task(scheduler.run(Priority.ALERT, 'channel:4', send(http, 4)))
+            results = await asyncio.gather(busy, older, newer, alert, return_exceptions=True)
+            await scheduler.stop()
+            return results, server.requests
+
+    results, requests = asyncio.run(scenario())
+    assert isinstance(results[2], RequestDropped)
+    assert not any(isinstance(result, Exception) for i, result in enumerate(results) if i != 2)
+    assert 'channel:3' not in requests
+
+
+def test_cosmetic_traffic_is_shed_under_pressure():
+    async def scenario():
+        async with fake_http() as (server, http):
+            scheduler = RestScheduler(concurrency=1, max_queue=4, shed_ratio=0.5)
+            scheduler.start()
+            busy = asyncio.create_task(scheduler.run(Priority.ALERT, 'channel:1', send(http, 1)))
+            await wait_started(server)
+            queued = [asyncio.create_task(scheduler.run(Priority.INTERACTION, f'channel:{i}', send(http, i)))
+                      for i in (2, 3)]
+            await asyncio.sleep(0)
+            with pytest.raises(RequestDropped):
+                await scheduler.run(Priority.COSMETIC, 'channel:9', send(http, 9))
+            await asyncio.gather(busy, *queued)
+            await scheduler.stop()
+
+    asyncio.run(scenario())
+
+
+def test_queued_job_expires_at_its_deadline_but_started_job_completes():
+    async def scenario():
+        async with fake_http(latency=0.3) as (server, http):
+            scheduler = RestScheduler(concurrency=1, max_queue=10)
+            scheduler.start()
+            # Échéance dépassée pendant l'envoi : il est commencé, son résultat est attendu
+            started = asyncio.create_task(
+                scheduler.run(Priority.ALERT, 'channel:1', send(http, 1), deadline=time.monotonic() + 0.1)
+            )
+            await wait_started(server)
+            expire_start = time.monotonic()
+            with pytest.raises(RequestExpired):
+                await scheduler.run(Priority.ALERT, 'channel:2', send(http, 2), deadline=time.monotonic() + 0.05)
+            expired_after = time.monotonic() - expire_start
+            await started
+            await scheduler.stop()
+            return [route for _, route, _ in server.timeline], expired_after, len(scheduler)
+
+    delivered, expired_after, pending = asyncio.run(scenario())
+    assert delivered == ['channel:1']
+    assert expired_after < 0.25
+    assert pending == 0
+
+
+def test_rate_limited_alert_is_requeued_and_delivered():
+    async def scenario():
+        async with fake_http(latency=0.01) as (server, http):
+            scheduler = RestScheduler(concurrency=2, max_queue=10)
+            scheduler.start()
+            attempts = []
+
+            async def limited_once():
+                attempts.append(time.monotonic())
+                if len(attempts) == 1:
+                    raise discord.RateLimited(0.1)
+                return await send(http, 1)()
+
+            await scheduler.run(Priority.ALERT, 'channel:1', limited_once)
+            await scheduler.stop()
+            return [route for _, route, _ in server.timeline], attempts
+
+    delivered, attempts = asyncio.run(scenario())
+    assert delivered == ['channel:1']
+    assert len(attempts) == 2
+    # La route est restée en pause le temps demandé par Discord
+    assert attempts[1] - attempts[0] >= 0.1
+
+
+def test_rate_limited_cosmetic_job_is_dropped():
+    async def scenario():
+        scheduler = RestScheduler(concurrency=1, max_queue=10)
+        scheduler.start()
+
+        async def limited():
+            raise discord.RateLimited(0.1)
+
+        try:
+            with pytest.raises(RequestDropped):
+                await scheduler.run(Priority.COSMETIC, 'presence', limited)
+        finally:
+            await scheduler.stop()
+
+    asyncio.run(scenario())
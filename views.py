@@ -1,7 +1,15 @@
 import discord
 from discord.ext import commands
 import logging
+import math
+import time
+from typing import Sequence
 from config import Config
+from alert_pipeline import AlertJob, alert_pipeline, failure_message, reply
+from permissions import DENIED_MANAGE, DENIED_ROLE, permission_cache
+from alert_targets import AlertTarget, ChannelTarget, TargetError, parse_targets
+from metrics import ALERTS_THROTTLED, count_error, timed
+from ratelimit import alert_rate_limiter
 
 logger = logging.getLogger('discord_bot')
 
@@ -16,11 +24,12 @@ class MessageButtonView(discord.ui.View):
         style=discord.ButtonStyle.danger,
         custom_id="alert_button"
     )
+    @timed('alert_button')
     async def alert_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Bouton pour envoyer une attaque percepteur"""
-        await self.send_message_to_channel(
+        await self.send_message_to_targets(
             interaction,
-            Config.ALERT_CHANNEL_ID,
+            parse_targets(Config.ALERT_TARGETS, Config.ALERT_CHANNEL_ID),
             f"🚨 **ATTAQUE PERCEPTEUR**\n\n{interaction.user.mention} a déclencher l'alerte ! <@&1342890492463022121> si vous le pouvez venez défendre !",
             "Attaque Percepteur signalée!"
         )
@@ -35,37 +44,43 @@ class MessageButtonView(discord.ui.View):
             message_content: Le contenu du message à envoyer
             success_message: Le message de confirmation à afficher
         """
+        await self.send_message_to_targets(interaction, (ChannelTarget(channel_id),), message_content, success_message)
+    
+    async def send_message_to_targets(self, interaction: discord.Interaction, targets: Sequence[AlertTarget], message_content: str, success_message: str):
+        """
+        Envoie un message vers plusieurs destinations (channels et/ou webhooks) en parallèle
+        
+        Args:
+            interaction: L'interaction Discord
+            targets: Les destinations du message
+            message_content: Le contenu du message à envoyer
+            success_message: Le message de confirmation à afficher
+        """
+        pressed_at = time.perf_counter()
         try:
             # Vérifier si l'utilisateur a les permissions
             if not await self.check_user_permissions(interaction):
                 return
             
-            # Obtenir le channel
-            channel = interaction.client.get_channel(channel_id)
-            
-            if not channel:
-                await interaction.response.send_message(
-                    "❌ Channel non trouvé! Vérifiez la configuration.",
-                    ephemeral=True
-                )
-                logger.error(f"Channel {channel_id} not found")
-                return
-            
-            # Vérifier que c'est un channel de texte
-            if not isinstance(channel, discord.TextChannel):
+            # Limiter les appuis répétés (utilisateur, serveur, destination principale) avant tout appel REST
+            throttled = alert_rate_limiter.check(interaction.user.id, interaction.guild_id, targets[0].key)
+            if throttled:
+                scope, retry_after = throttled
+                ALERTS_THROTTLED.labels(scope).inc()
                 await interaction.response.send_message(
-                    "❌ Le channel configuré n'est pas un channel de texte!",
+                    f"⏳ Trop d'alertes, réessayez dans {math.ceil(retry_after)}s.",
                     ephemeral=True
                 )
                 return
             
-            # Vérifier les permissions du bot
-            if interaction.guild and interaction.guild.me:
-                if not channel.permissions_for(interaction.guild.me).send_messages:
-                    await interaction.response.send_message(
-                        f"❌ Le bot n'a pas la permission d'envoyer des messages dans {channel.mention}",
-                        ephemeral=True
-                    )
+            # Une seule destination : la vérifier tout de suite pour répondre l'erreur directement
+            # (avec plusieurs destinations, chaque échec est rapporté dans le bilan du follow-up)
+            if len(targets) == 1:
+                try:
+                    await targets[0].prepare(interaction.client)
+                except TargetError as e:
+                    await interaction.response.send_message(str(e), ephemeral=True)
+                    logger.error(f"Target {targets[0].route} unavailable: {e}")
                     return
             
             # Créer l'embed pour le message
@@ -79,43 +94,39 @@ class MessageButtonView(discord.ui.View):
                 icon_url=interaction.user.display_avatar.url
             )
             
-            # Envoyer le message
-            sent_message = await channel.send(embed=embed)
-            
-            # Confirmer l'envoi
-            success_embed = discord.Embed(
-                title="✅ Succès",
-                description=f"{success_message}\n"
-                           f"**Channel:** {channel.mention}\n"
-                           f"**Message:** [Voir le message]({sent_message.jump_url})",
-                color=discord.Color.green()
-            )
-            
-            await interaction.response.send_message(embed=success_embed, ephemeral=True)
+            if Config.ALERT_DEFER_MODE:
+                # Acquitter tout de suite, la livraison se fait en arrière-plan
+                await interaction.response.defer(ephemeral=True, thinking=True)
+                acked_at = time.perf_counter()
+                alert_pipeline.timings.record('ack', (acked_at - pressed_at) * 1000)
+                job = AlertJob(interaction, targets, embed, success_message, acked_at, pressed_at)
+                if alert_pipeline.submit(job):
+                    return
+            else:
+                job = AlertJob(interaction, targets, embed, success_message, pressed_at)
             
-            # Log l'action
-            logger.info(f"Message sent by {interaction.user} to channel {channel.name} ({channel_id})")
+            # Envoyer le message et confirmer l'envoi
+            await alert_pipeline.deliver(job)
             
         except discord.Forbidden:
-            await interaction.response.send_message(
-                "❌ Permission refusée. Le bot n'a pas les droits nécessaires.",
-                ephemeral=True
-            )
-            logger.error(f"Forbidden: Cannot send message to channel {channel_id}")
+            count_error('Forbidden')
+            await reply(interaction, "❌ Permission refusée. Le bot n'a pas les droits nécessaires.")
+            logger.error(f"Forbidden: Cannot answer interaction {interaction.id}")
             
         except discord.HTTPException as e:
-            await interaction.response.send_message(
-                f"❌ Erreur lors de l'envoi du message: {str(e)}",
-                ephemeral=True
-            )
+            count_error(type(e).__name__)
+            await reply(interaction, f"❌ Erreur lors de l'envoi du message: {str(e)}")
             logger.error(f"HTTP error sending message: {e}")
             
+        except discord.RateLimited as e:
+            count_error('RateLimited')
+            await reply(interaction, failure_message(e))
+            logger.error(f"Rate limited sending message: {e}")
+            
         except Exception as e:
-            await interaction.response.send_message(
-                "❌ Une erreur inattendue s'est produite.",
-                ephemeral=True
-            )
-            logger.error(f"Unexpected error in send_message_to_channel: {e}")
+            count_error(type(e).__name__)
+            await reply(interaction, "❌ Une erreur inattendue s'est produite.")
+            logger.error(f"Unexpected error in send_message_to_targets: {e}")
     
     async def check_user_permissions(self, interaction: discord.Interaction) -> bool:
         """
@@ -127,27 +138,26 @@ class MessageButtonView(discord.ui.View):
         Returns:
             bool: True si l'utilisateur a les permissions, False sinon
         """
-        # Vérifier si l'utilisateur a des rôles autorisés (si configurés)
-        if Config.ALLOWED_ROLE_IDS and isinstance(interaction.user, discord.Member):
-            user_role_ids = [role.id for role in interaction.user.roles]
-            if not any(role_id in Config.ALLOWED_ROLE_IDS for role_id in user_role_ids):
-                await interaction.response.send_message(
-                    "❌ Vous n'avez pas les permissions nécessaires pour utiliser ce bouton.",
-                    ephemeral=True
-                )
-                logger.warning(f"User {interaction.user} attempted to use button without permission")
-                return False
+        if not isinstance(interaction.user, discord.Member):
+            return True
+        
+        # Décision mise en cache par (serveur, membre), invalidée par les événements gateway
+        decision = permission_cache.check(interaction.user, Config.ALLOWED_ROLE_IDS)
         
-        # Vérifier les permissions de gestion des messages pour les membres du serveur
-        if isinstance(interaction.user, discord.Member) and interaction.user.guild_permissions:
-            if not interaction.user.guild_permissions.manage_messages:
-                # Si pas de rôles spécifiques configurés, vérifier les permissions Discord
-                if not Config.ALLOWED_ROLE_IDS:
-                    await interaction.response.send_message(
-                        "❌ Vous devez avoir la permission 'Gérer les messages' pour utiliser ce bouton.",
-                        ephemeral=True
-                    )
-                    return False
+        if decision == DENIED_ROLE:
+            await interaction.response.send_message(
+                "❌ Vous n'avez pas les permissions nécessaires pour utiliser ce bouton.",
+                ephemeral=True
+            )
+            logger.warning(f"User {interaction.user} attempted to use button without permission")
+            return False
+        
+        if decision == DENIED_MANAGE:
+            await interaction.response.send_message(
+                "❌ Vous devez avoir la permission 'Gérer les messages' pour utiliser ce bouton.",
+                ephemeral=True
+            )
+            return False
         
         return True
 
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Callable, Deque, List, Optional
+from metrics import LOOP_LAG, LOOP_STALLS
+
+logger = logging.getLogger('discord_bot')
+
+# Nombre d'échantillons de lag conservés pour les percentiles (fenêtre glissante)
+_LAG_WINDOW = 3000
+
+
+class LoopWatchdog:
+    """
+    Mesure le retard d'ordonnancement de la boucle asyncio
+
+    Une tâche se réveille toutes les `interval` secondes et mesure de
+    combien son réveil a été retardé ; les mesures alimentent un histogramme
+    et une fenêtre glissante (p50/p99/max). Un thread auxiliaire surveille
+    le battement de cette tâche : si la boucle est bloquée plus de
+    `stall_threshold` secondes, il capture la pile du code bloquant dans le
+    thread de la boucle et la logge.
+
+    Toutes les `report_interval` secondes, le watchdog logge un résumé et
+    appelle les `reporters` enregistrés (résumé des sondes, des alertes...).
+    """
+
+    def __init__(self, interval: float = 0.1, stall_threshold: float = 0.5, report_interval: float = 300):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.report_interval = report_interval
+        self.reporters: List[Callable[[], None]] = []
+        self.stalls = 0
+        self.last_stall_stack: Optional[str] = None
+        self._lags: Deque[float] = deque(maxlen=_LAG_WINDOW)
+        self._beat = time.perf_counter()
+        self._loop_thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Démarre la tâche de mesure et le thread de surveillance"""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run(), name='loop-watchdog')
+        self._monitor = threading.Thread(target=self._watch, name='loop-watchdog-monitor', daemon=True)
+        self._monitor.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        next_report = time.perf_counter() + self.report_interval
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(0.0, now - expected)
+            self._beat = now
+            self._lags.append(lag)
+            LOOP_LAG.observe(lag)
+
+            if now >= next_report:
+                next_report = now + self.report_interval
+                self.report()
+
+    def _watch(self):
+        """Thread auxiliaire : détecte les blocages et capture la pile de la boucle"""
+        reported_beat = None
+        check_every = max(0.01, self.stall_threshold / 4)
+        while not self._stop.wait(check_every):
+            beat = self._beat
+            blocked_for = time.perf_counter() - beat - self.interval
+            if blocked_for < self.stall_threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+            self.stalls += 1
+            LOOP_STALLS.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else '<pile indisponible>'
+            self.last_stall_stack = stack
+            logger.warning(f"Event loop blocked for more than {blocked_for * 1000:.0f}ms, blocking code:\n{stack}")
+
+    def stats(self) -> dict:
+        """Statistiques de lag (ms) sur la fenêtre glissante"""
+        lags = sorted(self._lags)
+        if not lags:
+            return {"samples": 0, "stalls": self.stalls}
+        return {
+            "samples": len(lags),
+            "p50_ms": round(lags[len(lags) // 2] * 1000, 2),
+            "p99_ms": round(lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000, 2),
+            "max_ms": round(lags[-1] * 1000, 2),
+            "stalls": self.stalls,
+        }
+
+    def report(self):
+        """Logge le résumé du lag puis appelle les reporters enregistrés"""
+        logger.info(f"Event loop lag: {self.stats()}")
+        for reporter in self.reporters:
+            try:
+                reporter()
+            except Exception as e:
+                logger.error(f"Periodic report failed: {e}")